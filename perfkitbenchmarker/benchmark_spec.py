@@ -14,14 +14,21 @@
 """Container for all data required for a benchmark to run."""
 
 
+import _thread
 import contextlib
 import copy
+import copyreg
+import dataclasses
 import datetime
+import functools
 import importlib
+import itertools
 import logging
 import os
 import pickle
+import re
 import threading
+from typing import Optional
 import uuid
 
 from absl import flags
@@ -53,10 +60,6 @@ from perfkitbenchmarker import vm_util
 from perfkitbenchmarker import vpn_service
 from perfkitbenchmarker.configs import freeze_restore_spec
 from perfkitbenchmarker.providers.gcp import gcp_spanner
-import six
-from six.moves import range
-import six.moves._thread
-import six.moves.copyreg
 
 
 def PickleLock(lock):
@@ -70,7 +73,7 @@ def UnPickleLock(locked, *args):
       raise pickle.UnpicklingError('Cannot acquire lock')
   return lock
 
-six.moves.copyreg.pickle(six.moves._thread.LockType, PickleLock)
+copyreg.pickle(_thread.LockType, PickleLock)
 
 SUPPORTED = 'strict'
 NOT_EXCLUDED = 'permissive'
@@ -79,6 +82,33 @@ SKIP_CHECK = 'none'
 # numbers and International characters.
 # metadata allow all characters and numbers.
 METADATA_TIME_FORMAT = '%Y%m%dt%H%M%Sz'
+# Matches characters that are not letters, numbers or underscores. Like
+# str.isalpha and str.isnumeric, \w includes International characters.
+_UNSAFE_LABEL_CHARACTERS = re.compile(r'\W')
+# Max length constraint on label keys and values.
+# https://cloud.google.com/resource-manager/docs/creating-managing-labels
+_MAX_SAFE_LABEL_LENGTH = 63
+# Transient BenchmarkSpec attributes, mapped to a factory for their initial
+# value. They are dropped when the spec is pickled and recreated when it is
+# unpickled.
+_TRANSIENT_ATTRS = {
+    'networks_lock': threading.Lock,
+    'firewalls_lock': threading.Lock,
+    'vpn_gateways_lock': threading.Lock,
+    'vpns_lock': threading.Lock,
+    '_supported_clouds': set,
+}
+# Optional BenchmarkSpec attributes that specs pickled by older versions may
+# lack. They default to None when such a spec is unpickled.
+_OPTIONAL_ATTRS = ('data_discovery_service', 'freeze_path',
+                   'messaging_service', 'non_relational_db', 'relational_db',
+                   'restore_spec', 'spanner', 'vpn_service')
+_WINDOWS_OS_TYPES = frozenset(os_types.WINDOWS_OS_TYPES)
+# DPB service types whose VMs are provisioned by the benchmark spec.
+_UNMANAGED_DPB_SERVICE_TYPES = frozenset([
+    dpb_service.UNMANAGED_DPB_SVC_YARN_CLUSTER,
+    dpb_service.UNMANAGED_SPARK_CLUSTER
+])
 FLAGS = flags.FLAGS
 
 flags.DEFINE_enum('cloud', providers.GCP, providers.VALID_CLOUDS,
@@ -93,6 +123,17 @@ flags.DEFINE_string('postrun_script', None,
                     'Script to run right after run stage.')
 flags.DEFINE_integer('create_and_boot_post_task_delay', None,
                      'Delay in seconds to delay in between boot tasks.')
+flags.DEFINE_boolean('create_services_in_parallel', False,
+                     'If true, create the managed services that are only '
+                     'provisioned through cloud APIs (e.g. managed databases, '
+                     'TPUs, EDW, messaging) in parallel. Failures are then '
+                     'raised wrapped in a ThreadException, and the other '
+                     'services are still created when one of them fails.')
+flags.DEFINE_boolean('overlap_boot_and_firewall', False,
+                     'If true, open the remote access ports of each VM while '
+                     'waiting for it to boot rather than before. This hides '
+                     'the firewall API latency, but changes what the '
+                     'cluster_boot timings include.')
 # pyformat: disable
 flags.DEFINE_enum('benchmark_compatibility_checking', SUPPORTED,
                   [SUPPORTED, NOT_EXCLUDED, SKIP_CHECK],
@@ -106,6 +147,44 @@ flags.DEFINE_enum('benchmark_compatibility_checking', SUPPORTED,
 # pyformat: enable
 
 
+def _SafeLabelKeyOrValue(key):
+  return _UNSAFE_LABEL_CHARACTERS.sub('_', key.lower())[:_MAX_SAFE_LABEL_LENGTH]
+
+
+@functools.lru_cache(maxsize=1)
+def _GetMetadataTags(metadata):
+  """Returns the sanitized resource tags for the --metadata key:value pairs.
+
+  --metadata does not change during a run, so the parsed and sanitized tags
+  are cached instead of being rebuilt for every tagged resource.
+
+  Args:
+    metadata: tuple of the --metadata key:value strings.
+
+  Returns:
+    dict mapping sanitized keys to sanitized values. Callers must not modify
+    it.
+  """
+  return {
+      _SafeLabelKeyOrValue(key): _SafeLabelKeyOrValue(value)
+      for key, value in flag_util.ParseKeyValuePairs(metadata).items()
+  }
+
+
+@dataclasses.dataclass
+class BenchmarkSpecState:
+  """Restorable state of a BenchmarkSpec written out by Freeze.
+
+  Only resources that support freeze/restore are kept, so the freeze file does
+  not carry VMs, networks, locks or the benchmark config. The field names match
+  the BenchmarkSpec attributes so that either object can be used as a
+  restore_spec.
+  """
+  # String annotations, since the non_relational_db field shadows the module.
+  non_relational_db: Optional['non_relational_db.BaseNonRelationalDb'] = None
+  spanner: Optional['gcp_spanner.GcpSpannerInstance'] = None
+
+
 class BenchmarkSpec(object):
   """Contains the various data required to make a benchmark run."""
 
@@ -159,6 +238,8 @@ class BenchmarkSpec(object):
     self.data_discovery_service = None
     self.app_groups = {}
     self._zone_index = 0
+    # Clouds that already passed _CheckBenchmarkSupport.
+    self._supported_clouds = set()
     self.capacity_reservations = []
     self.placement_group_specs = benchmark_config.placement_group_specs or {}
     self.placement_groups = {}
@@ -188,6 +269,20 @@ class BenchmarkSpec(object):
   def __repr__(self):
     return '%s(%r)' % (self.__class__, self.__dict__)
 
+  def __getstate__(self):
+    state = self.__dict__.copy()
+    for attr in _TRANSIENT_ATTRS:
+      state.pop(attr, None)
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    for attr, factory in _TRANSIENT_ATTRS.items():
+      setattr(self, attr, factory())
+    for attr in _OPTIONAL_ATTRS:
+      self.__dict__.setdefault(attr, None)
+    self.__dict__.setdefault('placement_groups', {})
+
   def __str__(self):
     return(
         'Benchmark name: {0}\nFlags: {1}'
@@ -217,15 +312,13 @@ class BenchmarkSpec(object):
     Returns:
       True if successful, False otherwise.
     """
-    if not hasattr(self, 'restore_spec'):
-      return False
-    if not self.restore_spec or not hasattr(self.restore_spec, attribute_name):
-      return False
     if not resource_spec.enable_freeze_restore:
       return False
+    frozen_resource = getattr(self.restore_spec, attribute_name, None)
+    if frozen_resource is None:
+      return False
     logging.info('Getting %s instance from restore_spec', attribute_name)
-    frozen_resource = copy.copy(getattr(self.restore_spec, attribute_name))
-    setattr(self, attribute_name, frozen_resource)
+    setattr(self, attribute_name, copy.copy(frozen_resource))
     return True
 
   def ConstructContainerCluster(self):
@@ -267,10 +360,7 @@ class BenchmarkSpec(object):
 
     # If the dpb service is un-managed, the provisioning needs to be handed
     # over to the vm creation module.
-    if dpb_service_type in [
-        dpb_service.UNMANAGED_DPB_SVC_YARN_CLUSTER,
-        dpb_service.UNMANAGED_SPARK_CLUSTER
-    ]:
+    if dpb_service_type in _UNMANAGED_DPB_SERVICE_TYPES:
       # Ensure non cluster vms are not present in the spec.
       if self.vms_to_boot:
         raise Exception('Invalid Non cluster vm group {0} when benchmarking '
@@ -341,7 +431,7 @@ class BenchmarkSpec(object):
     """Constructs the BenchmarkSpec's cloud TPU objects."""
     tpu_group_specs = self.config.tpu_groups
 
-    for group_name, group_spec in sorted(six.iteritems(tpu_group_specs)):
+    for group_name, group_spec in sorted(tpu_group_specs.items()):
       tpu = self.ConstructTpuGroup(group_spec)
 
       self.tpu_groups[group_name] = tpu
@@ -371,6 +461,21 @@ class BenchmarkSpec(object):
     # Check if a new instance needs to be created or restored from snapshot
     self.edw_service = edw_service_class(self.config.edw_service)
 
+  def _GetGroupSpecWithDiskType(self, disk_type):
+    """Returns the first VM group spec that boots VMs with the disk type.
+
+    Args:
+      disk_type: The disk type to look for, e.g. disk.NFS.
+
+    Returns:
+      The matching group spec, or None if no group uses the disk type.
+    """
+    for group_spec in self.vms_to_boot.values():
+      disk_spec = group_spec.disk_spec
+      if disk_spec and group_spec.vm_count and disk_spec.disk_type == disk_type:
+        return group_spec
+    return None
+
   def ConstructNfsService(self):
     """Construct the NFS service object.
 
@@ -379,25 +484,22 @@ class BenchmarkSpec(object):
     if self.nfs_service:
       logging.info('NFS service already created: %s', self.nfs_service)
       return
-    for group_spec in self.vms_to_boot.values():
-      if not group_spec.disk_spec or not group_spec.vm_count:
-        continue
-      disk_spec = group_spec.disk_spec
-      if disk_spec.disk_type != disk.NFS:
-        continue
-      # Choose which nfs_service to create.
-      if disk_spec.nfs_ip_address:
-        self.nfs_service = nfs_service.StaticNfsService(disk_spec)
-      elif disk_spec.nfs_managed:
-        cloud = group_spec.cloud
-        providers.LoadProvider(cloud)
-        nfs_class = nfs_service.GetNfsServiceClass(cloud)
-        self.nfs_service = nfs_class(disk_spec, group_spec.vm_spec.zone)
-      else:
-        self.nfs_service = nfs_service.UnmanagedNfsService(disk_spec,
-                                                           self.vms[0])
-      logging.debug('NFS service %s', self.nfs_service)
-      break
+    group_spec = self._GetGroupSpecWithDiskType(disk.NFS)
+    if not group_spec:
+      return
+    disk_spec = group_spec.disk_spec
+    # Choose which nfs_service to create.
+    if disk_spec.nfs_ip_address:
+      self.nfs_service = nfs_service.StaticNfsService(disk_spec)
+    elif disk_spec.nfs_managed:
+      cloud = group_spec.cloud
+      providers.LoadProvider(cloud)
+      nfs_class = nfs_service.GetNfsServiceClass(cloud)
+      self.nfs_service = nfs_class(disk_spec, group_spec.vm_spec.zone)
+    else:
+      self.nfs_service = nfs_service.UnmanagedNfsService(disk_spec,
+                                                         self.vms[0])
+    logging.debug('NFS service %s', self.nfs_service)
 
   def ConstructSmbService(self):
     """Construct the SMB service object.
@@ -407,19 +509,14 @@ class BenchmarkSpec(object):
     if self.smb_service:
       logging.info('SMB service already created: %s', self.smb_service)
       return
-    for group_spec in self.vms_to_boot.values():
-      if not group_spec.disk_spec or not group_spec.vm_count:
-        continue
-      disk_spec = group_spec.disk_spec
-      if disk_spec.disk_type != disk.SMB:
-        continue
-
-      cloud = group_spec.cloud
-      providers.LoadProvider(cloud)
-      smb_class = smb_service.GetSmbServiceClass(cloud)
-      self.smb_service = smb_class(disk_spec, group_spec.vm_spec.zone)
-      logging.debug('SMB service %s', self.smb_service)
-      break
+    group_spec = self._GetGroupSpecWithDiskType(disk.SMB)
+    if not group_spec:
+      return
+    cloud = group_spec.cloud
+    providers.LoadProvider(cloud)
+    smb_class = smb_service.GetSmbServiceClass(cloud)
+    self.smb_service = smb_class(group_spec.disk_spec, group_spec.vm_spec.zone)
+    logging.debug('SMB service %s', self.smb_service)
 
   def ConstructVirtualMachineGroup(self, group_name, group_spec):
     """Construct the virtual machine(s) needed for a group."""
@@ -464,16 +561,22 @@ class BenchmarkSpec(object):
       group_spec.vm_spec.placement_group = self.placement_groups[
           group_spec.placement_group_name]
 
+    zone_list = FLAGS.zone
+    # Resolved on first use so that groups filled entirely by static VMs
+    # never look up a provider VM class.
+    vm_class = None
     for _ in range(vm_count - len(vms)):
       # Assign a zone to each VM sequentially from the --zones flag.
-      if FLAGS.zone:
-        zone_list = FLAGS.zone
+      if zone_list:
         group_spec.vm_spec.zone = zone_list[self._zone_index]
-        self._zone_index = (self._zone_index + 1
-                            if self._zone_index < len(zone_list) - 1 else 0)
+        self._zone_index = (self._zone_index + 1) % len(zone_list)
       if group_spec.cidr:  # apply cidr range to all vms in vm_group
         group_spec.vm_spec.cidr = group_spec.cidr
-      vm = self._CreateVirtualMachine(group_spec.vm_spec, os_type, cloud)
+      vm = static_vm.StaticVirtualMachine.GetStaticVirtualMachine()
+      if not vm:
+        if vm_class is None:
+          vm_class = self._GetVmClass(os_type, cloud)
+        vm = vm_class(group_spec.vm_spec)
       if disk_spec and not vm.is_static:
         if disk_spec.disk_type == disk.LOCAL and disk_count is None:
           disk_count = vm.max_local_disks
@@ -492,7 +595,7 @@ class BenchmarkSpec(object):
     """Construct capacity reservations for each VM group."""
     if not FLAGS.use_capacity_reservations:
       return
-    for vm_group in six.itervalues(self.vm_groups):
+    for vm_group in self.vm_groups.values():
       cloud = vm_group[0].CLOUD
       providers.LoadProvider(cloud)
       capacity_reservation_class = capacity_reservation.GetResourceClass(
@@ -505,6 +608,8 @@ class BenchmarkSpec(object):
 
     if FLAGS.benchmark_compatibility_checking == SKIP_CHECK:
       return
+    if cloud in self._supported_clouds:
+      return
 
     provider_info_class = provider_info.GetProviderInfoClass(cloud)
     benchmark_ok = provider_info_class.IsBenchmarkSupported(self.name)
@@ -517,6 +622,7 @@ class BenchmarkSpec(object):
                        '--benchmark_compatibility_checking=none '
                        'to override this check.'.format(
                            provider_info_class.CLOUD, self.name))
+    self._supported_clouds.add(cloud)
 
   def _ConstructJujuController(self, group_spec):
     """Construct a VirtualMachine object for a Juju controller."""
@@ -537,7 +643,7 @@ class BenchmarkSpec(object):
     vm_group_specs = self.vms_to_boot
 
     clouds = {}
-    for group_name, group_spec in sorted(six.iteritems(vm_group_specs)):
+    for group_name, group_spec in sorted(vm_group_specs.items()):
       vms = self.ConstructVirtualMachineGroup(group_name, group_spec)
 
       if group_spec.os_type == os_types.JUJU:
@@ -569,9 +675,8 @@ class BenchmarkSpec(object):
     # In the case of an un-managed yarn cluster, for hadoop software
     # installation, the dpb service instance needs access to constructed
     # master group and worker group.
-    if (self.config.dpb_service and self.config.dpb_service.service_type in [
-        dpb_service.UNMANAGED_DPB_SVC_YARN_CLUSTER,
-        dpb_service.UNMANAGED_SPARK_CLUSTER]):
+    if (self.config.dpb_service and self.config.dpb_service.service_type in
+        _UNMANAGED_DPB_SERVICE_TYPES):
       self.dpb_service.vms['master_group'] = self.vm_groups['master_group']
       if self.config.dpb_service.worker_count:
         self.dpb_service.vms['worker_group'] = self.vm_groups['worker_group']
@@ -579,8 +684,8 @@ class BenchmarkSpec(object):
         self.dpb_service.vms['worker_group'] = []
 
   def ConstructPlacementGroups(self):
-    for placement_group_name, placement_group_spec in six.iteritems(
-        self.placement_group_specs):
+    for placement_group_name, placement_group_spec in (
+        self.placement_group_specs.items()):
       self.placement_groups[placement_group_name] = self._CreatePlacementGroup(
           placement_group_spec, placement_group_spec.CLOUD)
 
@@ -645,12 +750,13 @@ class BenchmarkSpec(object):
         self.config.data_discovery_service)
 
   def Prepare(self):
-    targets = [(vm.PrepareBackgroundWorkload, (), {}) for vm in self.vms]
-    vm_util.RunParallelThreads(targets, len(targets))
+    # RunThreaded caps concurrency at --max_concurrent_threads rather than
+    # starting one thread per VM.
+    vm_util.RunThreaded(lambda vm: vm.PrepareBackgroundWorkload(), self.vms)
 
   def Provision(self):
     """Prepares the VMs and networks necessary for the benchmark to run."""
-    should_restore = hasattr(self, 'restore_spec') and self.restore_spec
+    should_restore = self.restore_spec is not None
     # Create capacity reservations if the cloud supports it. Note that the
     # capacity reservation class may update the VMs themselves. This is true
     # on AWS, because the VM needs to be aware of the capacity reservation id
@@ -669,28 +775,33 @@ class BenchmarkSpec(object):
     # deadlock by placing dependent networks later and their dependencies
     # earlier.
     networks = [
-        self.networks[key] for key in sorted(six.iterkeys(self.networks))
+        self.networks[key] for key in sorted(self.networks)
     ]
 
     vm_util.RunThreaded(lambda net: net.Create(), networks)
 
     # VPC peering is currently only supported for connecting 2 VPC networks
     if self.vpc_peering:
-      if len(networks) > 2:
+      num_networks = len(networks)
+      if num_networks > 2:
         raise errors.Error(
-            'Networks of size %d are not currently supported.' %
-            (len(networks)))
+            'Networks of size %d are not currently supported.' % num_networks)
       # Ignore Peering for one network
-      elif len(networks) == 2:
+      elif num_networks == 2:
         networks[0].Peer(networks[1])
 
     if self.container_registry:
       self.container_registry.Create()
-      for container_spec in six.itervalues(self.container_specs):
+      # Builds stay sequential: GetOrBuild logs in to the registry and local
+      # builds use a shared buildx builder, neither of which is thread safe.
+      full_images = {}
+      for container_spec in self.container_specs.values():
         if container_spec.static_image:
           continue
-        container_spec.image = self.container_registry.GetOrBuild(
-            container_spec.image)
+        image = container_spec.image
+        if image not in full_images:
+          full_images[image] = self.container_registry.GetOrBuild(image)
+        container_spec.image = full_images[image]
 
     if self.container_cluster:
       self.container_cluster.Create()
@@ -717,29 +828,46 @@ class BenchmarkSpec(object):
         self.nfs_service.Create()
       vm_util.RunThreaded(self.PrepareVmAfterBoot, self.vms)
 
-      sshable_vms = [
-          vm for vm in self.vms if vm.OS_TYPE not in os_types.WINDOWS_OS_TYPES
-      ]
-      sshable_vm_groups = {}
-      for group_name, group_vms in six.iteritems(self.vm_groups):
-        sshable_vm_groups[group_name] = [
-            vm for vm in group_vms
-            if vm.OS_TYPE not in os_types.WINDOWS_OS_TYPES
-        ]
+      # Every VM belongs to exactly one group, so filter each VM once and
+      # build sshable_vms from the filtered groups.
+      sshable_vm_groups = {
+          group_name: [
+              vm for vm in group_vms if vm.OS_TYPE not in _WINDOWS_OS_TYPES
+          ] for group_name, group_vms in self.vm_groups.items()
+      }
+      sshable_vms = list(
+          itertools.chain.from_iterable(sshable_vm_groups.values()))
       vm_util.GenerateSSHConfig(sshable_vms, sshable_vm_groups)
+    # Services whose Create installs packages on or reconfigures the benchmark
+    # VMs are always created one at a time, before the others.
+    vm_create_targets = []
+    # The remaining services are only created through cloud APIs, so they may
+    # be created in parallel with --create_services_in_parallel.
+    create_targets = []
     if self.spark_service:
-      self.spark_service.Create()
+      targets = (vm_create_targets
+                 if self.spark_service.CLOUD == spark_service.PKB_MANAGED
+                 else create_targets)
+      targets.append((self.spark_service.Create, (), {}))
     if self.dpb_service:
-      self.dpb_service.Create()
-    if hasattr(self, 'relational_db') and self.relational_db:
+      targets = (vm_create_targets
+                 if self.dpb_service.SERVICE_TYPE in _UNMANAGED_DPB_SERVICE_TYPES
+                 else create_targets)
+      targets.append((self.dpb_service.Create, (), {}))
+    if self.relational_db:
       self.relational_db.SetVms(self.vm_groups)
-      self.relational_db.Create(restore=should_restore)
+      targets = (create_targets if self.relational_db.is_managed_db
+                 else vm_create_targets)
+      targets.append(
+          (self.relational_db.Create, (), {'restore': should_restore}))
     if self.non_relational_db:
-      self.non_relational_db.Create(restore=should_restore)
+      create_targets.append(
+          (self.non_relational_db.Create, (), {'restore': should_restore}))
     if self.spanner:
-      self.spanner.Create(restore=should_restore)
-    if self.tpus:
-      vm_util.RunThreaded(lambda tpu: tpu.Create(), self.tpus)
+      create_targets.append(
+          (self.spanner.Create, (), {'restore': should_restore}))
+    for tpu in self.tpus:
+      create_targets.append((tpu.Create, (), {}))
     if self.edw_service:
       if (not self.edw_service.user_managed and
           self.edw_service.SERVICE_TYPE == 'redshift'):
@@ -748,91 +876,154 @@ class BenchmarkSpec(object):
         for network in networks:
           if network.__class__.__name__ == 'AwsNetwork':
             self.edw_service.cluster_subnet_group.subnet_id = network.subnet.id
-      self.edw_service.Create()
+      create_targets.append((self.edw_service.Create, (), {}))
     if self.vpn_service:
-      self.vpn_service.Create()
-    if hasattr(self, 'messaging_service') and self.messaging_service:
-      self.messaging_service.Create()
+      create_targets.append((self.vpn_service.Create, (), {}))
+    if self.messaging_service:
+      create_targets.append((self.messaging_service.Create, (), {}))
     if self.data_discovery_service:
-      self.data_discovery_service.Create()
+      create_targets.append((self.data_discovery_service.Create, (), {}))
+
+    for target, args, kwargs in vm_create_targets:
+      target(*args, **kwargs)
+    if FLAGS.create_services_in_parallel and len(create_targets) > 1:
+      vm_util.RunParallelThreads(create_targets, len(create_targets))
+    else:
+      for target, args, kwargs in create_targets:
+        target(*args, **kwargs)
 
   def Delete(self):
     if self.deleted:
       return
 
-    should_freeze = hasattr(self, 'freeze_path') and self.freeze_path
+    should_freeze = bool(self.freeze_path)
     if should_freeze:
       self.Freeze()
 
+    # Failures deleting managed services or the container cluster are
+    # recorded with their original type and the first one is re-raised once
+    # the rest of the spec has been torn down, so that e.g. a FreezeError is
+    # still reported.
+    teardown_errors = []
+
+    def _RecordTeardownError(target, *args, **kwargs):
+      try:
+        return target(*args, **kwargs)
+      except Exception as e:
+        teardown_errors.append(e)
+        raise
+
+    # Managed services are independent of each other, so delete them
+    # concurrently.
+    delete_targets = []
     if self.container_registry:
-      self.container_registry.Delete()
+      delete_targets.append((self.container_registry.Delete, (), {}))
     if self.spark_service:
-      self.spark_service.Delete()
+      delete_targets.append((self.spark_service.Delete, (), {}))
     if self.dpb_service:
-      self.dpb_service.Delete()
-    if hasattr(self, 'relational_db') and self.relational_db:
-      self.relational_db.Delete()
-    if hasattr(self, 'non_relational_db') and self.non_relational_db:
-      self.non_relational_db.Delete(freeze=should_freeze)
-    if hasattr(self, 'spanner') and self.spanner:
-      self.spanner.Delete(freeze=should_freeze)
-    if self.tpus:
-      vm_util.RunThreaded(lambda tpu: tpu.Delete(), self.tpus)
+      delete_targets.append((self.dpb_service.Delete, (), {}))
+    if self.relational_db:
+      delete_targets.append((self.relational_db.Delete, (), {}))
+    if self.non_relational_db:
+      delete_targets.append(
+          (self.non_relational_db.Delete, (), {'freeze': should_freeze}))
+    if self.spanner:
+      delete_targets.append(
+          (self.spanner.Delete, (), {'freeze': should_freeze}))
+    for tpu in self.tpus:
+      delete_targets.append((tpu.Delete, (), {}))
     if self.edw_service:
-      self.edw_service.Delete()
+      delete_targets.append((self.edw_service.Delete, (), {}))
     if self.nfs_service:
-      self.nfs_service.Delete()
+      delete_targets.append((self.nfs_service.Delete, (), {}))
     if self.smb_service:
-      self.smb_service.Delete()
-    if hasattr(self, 'messaging_service') and self.messaging_service:
-      self.messaging_service.Delete()
-    if hasattr(self, 'data_discovery_service') and self.data_discovery_service:
-      self.data_discovery_service.Delete()
-
-    # Note: It is ok to delete capacity reservations before deleting the VMs,
-    # and will actually save money (mere seconds of usage).
-    if self.capacity_reservations:
+      delete_targets.append((self.smb_service.Delete, (), {}))
+    if self.messaging_service:
+      delete_targets.append((self.messaging_service.Delete, (), {}))
+    if self.data_discovery_service:
+      delete_targets.append((self.data_discovery_service.Delete, (), {}))
+    if delete_targets:
       try:
-        vm_util.RunThreaded(lambda reservation: reservation.Delete(),
-                            self.capacity_reservations)
+        vm_util.RunParallelThreads(
+            [(_RecordTeardownError, (target,) + args, kwargs)
+             for target, args, kwargs in delete_targets],
+            len(delete_targets))
       except Exception:  # pylint: disable=broad-except
-        logging.exception('Got an exception deleting CapacityReservations. '
+        logging.exception('Got an exception deleting services. '
                           'Attempting to continue tearing down.')
 
-    if self.vms:
+    # Note: It is ok to delete capacity reservations before deleting the VMs,
+    # and will actually save money (mere seconds of usage). They are deleted
+    # alongside the VMs so that teardown only waits for one batch of threads.
+    delete_params = [((reservation.Delete,), {})
+                     for reservation in self.capacity_reservations]
+    delete_params.extend(((self.DeleteVm, vm), {}) for vm in self.vms)
+    if delete_params:
       try:
-        vm_util.RunThreaded(self.DeleteVm, self.vms)
-      except Exception:
-        logging.exception('Got an exception deleting VMs. '
+        vm_util.RunThreaded(lambda delete, *args: delete(*args), delete_params)
+      except Exception:  # pylint: disable=broad-except
+        logging.exception('Got an exception deleting VMs or '
+                          'CapacityReservations. '
                           'Attempting to continue tearing down.')
-    if hasattr(self, 'placement_groups'):
-      for placement_group_object in self.placement_groups.values():
-        placement_group_object.Delete()
-
-    for firewall in six.itervalues(self.firewalls):
+    if self.placement_groups:
       try:
-        firewall.DisallowAllPorts()
-      except Exception:
-        logging.exception('Got an exception disabling firewalls. '
+        vm_util.RunThreaded(lambda placement_group: placement_group.Delete(),
+                            list(self.placement_groups.values()))
+      except Exception:  # pylint: disable=broad-except
+        logging.exception('Got an exception deleting PlacementGroups. '
                           'Attempting to continue tearing down.')
 
+    # The container cluster does not depend on the firewall rules, so tear it
+    # down while they are disabled. Networks are only deleted after both.
+    teardown_targets = []
+    if self.firewalls:
+      teardown_targets.append((self._DisallowAllFirewallPorts, (), {}))
     if self.container_cluster:
-      self.container_cluster.DeleteServices()
-      self.container_cluster.DeleteContainers()
-      self.container_cluster.Delete()
+      teardown_targets.append((self._DeleteContainerCluster, (), {}))
+    if teardown_targets:
+      try:
+        vm_util.RunParallelThreads(
+            [(_RecordTeardownError, (target,) + args, kwargs)
+             for target, args, kwargs in teardown_targets],
+            len(teardown_targets))
+      except Exception:  # pylint: disable=broad-except
+        logging.exception('Got an exception deleting the container cluster. '
+                          'Attempting to continue tearing down.')
 
-    for net in six.itervalues(self.networks):
+    if self.networks:
       try:
-        net.Delete()
-      except Exception:
+        vm_util.RunThreaded(lambda net: net.Delete(),
+                            list(self.networks.values()))
+      except Exception:  # pylint: disable=broad-except
         logging.exception('Got an exception deleting networks. '
                           'Attempting to continue tearing down.')
 
-    if hasattr(self, 'vpn_service') and self.vpn_service:
-      self.vpn_service.Delete()
+    if self.vpn_service:
+      try:
+        _RecordTeardownError(self.vpn_service.Delete)
+      except Exception:  # pylint: disable=broad-except
+        logging.exception('Got an exception deleting the VPN service.')
+
+    if teardown_errors:
+      raise teardown_errors[0]
 
     self.deleted = True
 
+  def _DisallowAllFirewallPorts(self):
+    """Closes the ports of every firewall, logging rather than raising."""
+    try:
+      vm_util.RunThreaded(lambda firewall: firewall.DisallowAllPorts(),
+                          list(self.firewalls.values()))
+    except Exception:  # pylint: disable=broad-except
+      logging.exception('Got an exception disabling firewalls. '
+                        'Attempting to continue tearing down.')
+
+  def _DeleteContainerCluster(self):
+    """Deletes the container cluster along with its services and containers."""
+    self.container_cluster.DeleteServices()
+    self.container_cluster.DeleteContainers()
+    self.container_cluster.Delete()
+
   def GetSamples(self):
     """Returns samples created from benchmark resources."""
     samples = []
@@ -843,24 +1034,10 @@ class BenchmarkSpec(object):
     return samples
 
   def StartBackgroundWorkload(self):
-    targets = [(vm.StartBackgroundWorkload, (), {}) for vm in self.vms]
-    vm_util.RunParallelThreads(targets, len(targets))
+    vm_util.RunThreaded(lambda vm: vm.StartBackgroundWorkload(), self.vms)
 
   def StopBackgroundWorkload(self):
-    targets = [(vm.StopBackgroundWorkload, (), {}) for vm in self.vms]
-    vm_util.RunParallelThreads(targets, len(targets))
-
-  def _IsSafeKeyOrValueCharacter(self, char):
-    return char.isalpha() or char.isnumeric() or char == '_'
-
-  def _SafeLabelKeyOrValue(self, key):
-    result = ''.join(c if self._IsSafeKeyOrValueCharacter(c) else '_'
-                     for c in key.lower())
-
-    # max length contraints on keys and values
-    # https://cloud.google.com/resource-manager/docs/creating-managing-labels
-    max_safe_length = 63
-    return result[:max_safe_length]
+    vm_util.RunThreaded(lambda vm: vm.StopBackgroundWorkload(), self.vms)
 
   def _GetResourceDict(self, time_format, timeout_minutes=None):
     """Gets a list of tags to be used to tag resources."""
@@ -883,10 +1060,8 @@ class BenchmarkSpec(object):
     }
 
     # add metadata key value pairs
-    metadata_dict = (flag_util.ParseKeyValuePairs(FLAGS.metadata)
-                     if hasattr(FLAGS, 'metadata') else dict())
-    for key, value in metadata_dict.items():
-      tags[self._SafeLabelKeyOrValue(key)] = self._SafeLabelKeyOrValue(value)
+    if hasattr(FLAGS, 'metadata'):
+      tags.update(_GetMetadataTags(tuple(FLAGS.metadata)))
 
     return tags
 
@@ -911,29 +1086,25 @@ class BenchmarkSpec(object):
     else:
       return None
 
-  def _CreateVirtualMachine(self, vm_spec, os_type, cloud):
-    """Create a vm in zone.
+  def _GetVmClass(self, os_type, cloud):
+    """Returns the VM class for an OS type and cloud.
 
     Args:
-      vm_spec: A virtual_machine.BaseVmSpec object.
       os_type: The type of operating system for the VM. See the flag of the
           same name for more information.
       cloud: The cloud for the VM. See the flag of the same name for more
           information.
     Returns:
-      A virtual_machine.BaseVirtualMachine object.
+      A virtual_machine.BaseVirtualMachine subclass.
+    Raises:
+      errors.Error: If the OS type is not supported on the cloud.
     """
-    vm = static_vm.StaticVirtualMachine.GetStaticVirtualMachine()
-    if vm:
-      return vm
-
     vm_class = virtual_machine.GetVmClass(cloud, os_type)
     if vm_class is None:
       raise errors.Error(
           'VMs of type %s" are not currently supported on cloud "%s".' %
           (os_type, cloud))
-
-    return vm_class(vm_spec)
+    return vm_class
 
   def CreateAndBootVm(self, vm):
     """Creates a single VM and waits for boot to complete.
@@ -944,8 +1115,14 @@ class BenchmarkSpec(object):
     vm.Create()
     logging.info('VM: %s', vm.ip_address)
     logging.info('Waiting for boot completion.')
-    vm.AllowRemoteAccessPorts()
-    vm.WaitForBootCompletion()
+    if FLAGS.overlap_boot_and_firewall:
+      # WaitForBootCompletion retries until the remote access port answers,
+      # so it tolerates the ports being opened concurrently.
+      vm_util.RunParallelThreads([(vm.AllowRemoteAccessPorts, (), {}),
+                                  (vm.WaitForBootCompletion, (), {})], 2)
+    else:
+      vm.AllowRemoteAccessPorts()
+      vm.WaitForBootCompletion()
 
   def PrepareVmAfterBoot(self, vm):
     """Prepares a VM after it has booted.
@@ -960,10 +1137,12 @@ class BenchmarkSpec(object):
     """
     vm.AddMetadata()
     vm.OnStartup()
-    # Prepare vm scratch disks:
-    if any((spec.disk_type == disk.LOCAL for spec in vm.disk_specs)):
+    # Prepare vm scratch disks. Local disks must be set up before any
+    # scratch disk is created, so check for them first.
+    disk_specs = vm.disk_specs
+    if any(spec.disk_type == disk.LOCAL for spec in disk_specs):
       vm.SetupLocalDisks()
-    for disk_spec in vm.disk_specs:
+    for disk_spec in disk_specs:
       if disk_spec.disk_type == disk.RAM:
         vm.CreateRamDisk(disk_spec)
       else:
@@ -996,20 +1175,35 @@ class BenchmarkSpec(object):
     """Pickles the spec so that it can be unpickled on a subsequent run."""
     with open(filename or self._GetPickleFilename(self.uid),
               'wb') as pickle_file:
-      pickle.dump(self, pickle_file, 2)
+      pickle.dump(self, pickle_file, pickle.HIGHEST_PROTOCOL)
+
+  def GetState(self):
+    """Returns the BenchmarkSpecState of the resources that can be restored."""
+    return BenchmarkSpecState(
+        non_relational_db=self.non_relational_db, spanner=self.spanner)
+
+  def _PickleState(self, filename):
+    """Pickles the restorable state so that it can be used as a restore_spec."""
+    with open(filename, 'wb') as pickle_file:
+      pickle.dump(self.GetState(), pickle_file, pickle.HIGHEST_PROTOCOL)
 
   def Freeze(self):
-    """Pickles the spec to a destination, defaulting to tempdir if not found."""
+    """Pickles the state to a destination, defaulting to tempdir if not found.
+
+    Restore paths written by older versions contain a full pickled
+    BenchmarkSpec; those still work as a restore_spec since BenchmarkSpecState
+    uses the same attribute names.
+    """
     if not self.freeze_path:
       return
     logging.info('Freezing benchmark_spec to %s', self.freeze_path)
     try:
-      self.Pickle(self.freeze_path)
+      self._PickleState(self.freeze_path)
     except FileNotFoundError:
       default_path = f'{vm_util.GetTempDir()}/restore_spec.pickle'
       logging.exception('Could not find file path %s, defaulting freeze to %s.',
                         self.freeze_path, default_path)
-      self.Pickle(default_path)
+      self._PickleState(default_path)
 
   @classmethod
   def GetBenchmarkSpec(cls, benchmark_module, config, uid):
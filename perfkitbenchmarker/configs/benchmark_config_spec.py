@@ -45,12 +45,72 @@ from perfkitbenchmarker.configs import option_decoders
 from perfkitbenchmarker.configs import spec
 from perfkitbenchmarker.dpb_service import BaseDpbService
 from perfkitbenchmarker.providers.gcp import gcp_spanner
-import six
 
 _DEFAULT_DISK_COUNT = 1
 _DEFAULT_VM_COUNT = 1
 
 
+def _LoadProvider(cloud, flag_values):
+  """Loads the provider for 'cloud', honoring --ignore_package_requirements.
+
+  Args:
+    cloud: string. The cloud whose provider modules should be loaded.
+    flag_values: flags.FlagValues or None. Requirements are ignored when None.
+  """
+  ignore_package_requirements = (
+      getattr(flag_values, 'ignore_package_requirements', True)
+      if flag_values else True)
+  providers.LoadProvider(cloud, ignore_package_requirements)
+
+
+def _GetConfigSection(section, path):
+  """Returns the nested config section at path, or None if it is missing.
+
+  Args:
+    section: dict of config values, or None.
+    path: tuple of keys leading from section to the nested section.
+  """
+  for key in path:
+    if section is None or key not in section:
+      return None
+    section = section[key]
+  return section
+
+
+def _SetFlagOverride(section, path, flag_name, option_name, value):
+  """Overrides an option in a config section with the value of a flag.
+
+  Args:
+    section: dict. The config section at path, or None if it is missing.
+    path: tuple of keys leading from the config values to section.
+    flag_name: string. Name of the flag being applied.
+    option_name: string. Name of the option in section to override.
+    value: The flag value.
+
+  Raises:
+    errors.Config.MissingOption: If section is missing.
+  """
+  if section is None:
+    raise errors.Config.MissingOption(
+        f'--{flag_name} is set, but the config does not contain '
+        f'{".".join(path)}.')
+  section[option_name] = value
+
+
+def _ApplyCloudFlag(config_values, flag_values):
+  """Sets config_values['cloud'] from --cloud if given or if it is unset.
+
+  Args:
+    config_values: dict mapping config option names to provided values. May be
+      modified by this function.
+    flag_values: flags.FlagValues. Runtime flags that may override the
+      provided config values.
+  """
+  cloud_flag = flag_values['cloud']
+  if cloud_flag.present or 'cloud' not in config_values:
+    config_values['cloud'] = cloud_flag.value
+
+
 class _DpbApplicationListDecoder(option_decoders.ListDecoder):
   """Decodes the list of applications to be enabled on the dpb service."""
 
@@ -114,8 +174,7 @@ class _DpbServiceSpec(spec.BaseSpec):
   """
 
   def __init__(self, component_full_name, flag_values=None, **kwargs):
-    super(_DpbServiceSpec, self).__init__(
-        component_full_name, flag_values=flag_values, **kwargs)
+    super().__init__(component_full_name, flag_values=flag_values, **kwargs)
 
   @classmethod
   def _GetOptionDecoderConstructions(cls):
@@ -126,7 +185,7 @@ class _DpbServiceSpec(spec.BaseSpec):
       pair. The pair specifies a decoder class and its __init__() keyword
       arguments to construct in order to decode the named option.
     """
-    result = super(_DpbServiceSpec, cls)._GetOptionDecoderConstructions()
+    result = super()._GetOptionDecoderConstructions()
     result.update({
         'static_dpb_service_instance': (option_decoders.StringDecoder, {
             'default': None,
@@ -216,17 +275,16 @@ class _DpbServiceSpec(spec.BaseSpec):
       flag_values: flags.FlagValues. Runtime flags that may override the
         provided config values.
     """
-    super(_DpbServiceSpec, cls)._ApplyFlags(config_values, flag_values)
+    super()._ApplyFlags(config_values, flag_values)
     if flag_values['static_dpb_service_instance'].present:
       config_values['static_dpb_service_instance'] = (
           flag_values.static_dpb_service_instance)
     # TODO(saksena): Update the documentation for zones assignment
     if flag_values['zone'].present:
-      group = 'worker_group'
-      if group in config_values:
-        for cloud in config_values[group]['vm_spec']:
-          config_values[group]['vm_spec'][cloud]['zone'] = (
-              flag_values.zone[0])
+      if 'worker_group' in config_values:
+        zone = flag_values.zone[0]
+        for vm_spec in config_values['worker_group']['vm_spec'].values():
+          vm_spec['zone'] = zone
 
 
 class _TpuGroupSpec(spec.BaseSpec):
@@ -237,13 +295,12 @@ class _TpuGroupSpec(spec.BaseSpec):
                group_name,
                flag_values=None,
                **kwargs):
-    super(_TpuGroupSpec, self).__init__(
-        '{0}.{1}'.format(component_full_name, group_name),
+    super().__init__(
+        f'{component_full_name}.{group_name}',
         flag_values=flag_values,
         **kwargs)
     if not self.tpu_name:
-      self.tpu_name = 'pkb-tpu-{group_name}-{run_uri}'.format(
-          group_name=group_name, run_uri=flag_values.run_uri)
+      self.tpu_name = f'pkb-tpu-{group_name}-{flag_values.run_uri}'
 
   @classmethod
   def _GetOptionDecoderConstructions(cls):
@@ -254,7 +311,7 @@ class _TpuGroupSpec(spec.BaseSpec):
       The pair specifies a decoder class and its __init__() keyword arguments
       to construct in order to decode the named option.
     """
-    result = super(_TpuGroupSpec, cls)._GetOptionDecoderConstructions()
+    result = super()._GetOptionDecoderConstructions()
     result.update({
         'cloud': (option_decoders.EnumDecoder, {
             'valid_values': providers.VALID_CLOUDS
@@ -298,25 +355,13 @@ class _TpuGroupSpec(spec.BaseSpec):
       flag_values: flags.FlagValues. Runtime flags that may override the
         provided config values.
     """
-    super(_TpuGroupSpec, cls)._ApplyFlags(config_values, flag_values)
-    if flag_values['cloud'].present:
-      config_values['cloud'] = flag_values.cloud
-    if flag_values['tpu_cidr_range'].present:
-      config_values['tpu_cidr_range'] = flag_values.tpu_cidr_range
-    if flag_values['tpu_accelerator_type'].present:
-      config_values['tpu_accelerator_type'] = flag_values.tpu_accelerator_type
-    if flag_values['tpu_description'].present:
-      config_values['tpu_description'] = flag_values.tpu_description
-    if flag_values['tpu_network'].present:
-      config_values['tpu_network'] = flag_values.tpu_network
-    if flag_values['tpu_tf_version'].present:
-      config_values['tpu_tf_version'] = flag_values.tpu_tf_version
-    if flag_values['tpu_zone'].present:
-      config_values['tpu_zone'] = flag_values.tpu_zone
-    if flag_values['tpu_name'].present:
-      config_values['tpu_name'] = flag_values.tpu_name
-    if flag_values['tpu_preemptible'].present:
-      config_values['tpu_preemptible'] = flag_values.tpu_preemptible
+    super()._ApplyFlags(config_values, flag_values)
+    # Each of these flags overrides the config option of the same name.
+    for option_name in ('cloud', 'tpu_cidr_range', 'tpu_accelerator_type',
+                        'tpu_description', 'tpu_network', 'tpu_tf_version',
+                        'tpu_zone', 'tpu_name', 'tpu_preemptible'):
+      if flag_values[option_name].present:
+        config_values[option_name] = flag_values[option_name].value
 
 
 class _EdwServiceDecoder(option_decoders.TypeVerifier):
@@ -363,8 +408,7 @@ class _EdwServiceSpec(spec.BaseSpec):
   """
 
   def __init__(self, component_full_name, flag_values=None, **kwargs):
-    super(_EdwServiceSpec, self).__init__(
-        component_full_name, flag_values=flag_values, **kwargs)
+    super().__init__(component_full_name, flag_values=flag_values, **kwargs)
 
   @classmethod
   def _GetOptionDecoderConstructions(cls):
@@ -375,7 +419,7 @@ class _EdwServiceSpec(spec.BaseSpec):
       The pair specifies a decoder class and its __init__() keyword arguments to
       construct in order to decode the named option.
     """
-    result = super(_EdwServiceSpec, cls)._GetOptionDecoderConstructions()
+    result = super()._GetOptionDecoderConstructions()
     result.update({
         'type': (option_decoders.StringDecoder, {
             'default': 'redshift',
@@ -452,24 +496,21 @@ class _EdwServiceSpec(spec.BaseSpec):
       flag_values: flags.FlagValues. Runtime flags that may override the
         provided config values.
     """
-    super(_EdwServiceSpec, cls)._ApplyFlags(config_values, flag_values)
+    super()._ApplyFlags(config_values, flag_values)
     # TODO(saksena): Add cluster_subnet_group and cluster_parameter_group flags
     # Restoring from a snapshot, so defer to the user supplied cluster details
-    if flag_values['edw_service_cluster_snapshot'].present:
-      config_values['snapshot'] = flag_values.edw_service_cluster_snapshot
-    if flag_values['edw_service_cluster_identifier'].present:
-      config_values['cluster_identifier'] = (
-          flag_values.edw_service_cluster_identifier)
-    if flag_values['edw_service_endpoint'].present:
-      config_values['endpoint'] = flag_values.edw_service_endpoint
-    if flag_values['edw_service_cluster_concurrency'].present:
-      config_values['concurrency'] = flag_values.edw_service_cluster_concurrency
-    if flag_values['edw_service_cluster_db'].present:
-      config_values['db'] = flag_values.edw_service_cluster_db
-    if flag_values['edw_service_cluster_user'].present:
-      config_values['user'] = flag_values.edw_service_cluster_user
-    if flag_values['edw_service_cluster_password'].present:
-      config_values['password'] = flag_values.edw_service_cluster_password
+    option_name_from_flag = {
+        'edw_service_cluster_snapshot': 'snapshot',
+        'edw_service_cluster_identifier': 'cluster_identifier',
+        'edw_service_endpoint': 'endpoint',
+        'edw_service_cluster_concurrency': 'concurrency',
+        'edw_service_cluster_db': 'db',
+        'edw_service_cluster_user': 'user',
+        'edw_service_cluster_password': 'password',
+    }
+    for flag_name, option_name in option_name_from_flag.items():
+      if flag_values[flag_name].present:
+        config_values[option_name] = flag_values[flag_name].value
 
 
 class _StaticVmDecoder(option_decoders.TypeVerifier):
@@ -515,36 +556,34 @@ class _RelationalDbSpec(freeze_restore_spec.FreezeRestoreSpec):
   """Configurable options of a database service."""
 
   def __init__(self, component_full_name, flag_values=None, **kwargs):
-    super(_RelationalDbSpec, self).__init__(
-        component_full_name, flag_values=flag_values, **kwargs)
+    super().__init__(component_full_name, flag_values=flag_values, **kwargs)
     # TODO(user): This is a lot of boilerplate, and is repeated
     # below in VmGroupSpec. See if some can be consolidated. Maybe we can
     # specify a VmGroupSpec instead of both vm_spec and disk_spec.
-    ignore_package_requirements = (
-        getattr(flag_values, 'ignore_package_requirements', True)
-        if flag_values else True)
-    providers.LoadProvider(self.cloud, ignore_package_requirements)
+    _LoadProvider(self.cloud, flag_values)
 
     if self.db_disk_spec:
       disk_config = getattr(self.db_disk_spec, self.cloud, None)
       if disk_config is None:
         raise errors.Config.MissingOption(
-            '{0}.cloud is "{1}", but {0}.db_disk_spec does not contain a '
-            'configuration for "{1}".'.format(component_full_name, self.cloud))
+            f'{component_full_name}.cloud is "{self.cloud}", but '
+            f'{component_full_name}.db_disk_spec does not contain a '
+            f'configuration for "{self.cloud}".')
       disk_spec_class = disk.GetDiskSpecClass(self.cloud)
       self.db_disk_spec = disk_spec_class(
-          '{0}.db_disk_spec.{1}'.format(component_full_name, self.cloud),
+          f'{component_full_name}.db_disk_spec.{self.cloud}',
           flag_values=flag_values,
           **disk_config)
 
     db_vm_config = getattr(self.db_spec, self.cloud, None)
     if db_vm_config is None:
       raise errors.Config.MissingOption(
-          '{0}.cloud is "{1}", but {0}.db_spec does not contain a '
-          'configuration for "{1}".'.format(component_full_name, self.cloud))
+          f'{component_full_name}.cloud is "{self.cloud}", but '
+          f'{component_full_name}.db_spec does not contain a '
+          f'configuration for "{self.cloud}".')
     db_vm_spec_class = virtual_machine.GetVmSpecClass(self.cloud)
     self.db_spec = db_vm_spec_class(
-        '{0}.db_spec.{1}'.format(component_full_name, self.cloud),
+        f'{component_full_name}.db_spec.{self.cloud}',
         flag_values=flag_values,
         **db_vm_config)
 
@@ -556,9 +595,9 @@ class _RelationalDbSpec(freeze_restore_spec.FreezeRestoreSpec):
                                                     self.engine)
       self.engine_version = db_class.GetDefaultEngineVersion(self.engine)
     if not self.database_name:
-      self.database_name = 'pkb-db-%s' % flag_values.run_uri
+      self.database_name = f'pkb-db-{flag_values.run_uri}'
     if not self.database_username:
-      self.database_username = 'pkb%s' % flag_values.run_uri
+      self.database_username = f'pkb{flag_values.run_uri}'
     if not self.database_password:
       self.database_password = relational_db.GenerateRandomDbPassword()
 
@@ -571,7 +610,7 @@ class _RelationalDbSpec(freeze_restore_spec.FreezeRestoreSpec):
       The pair specifies a decoder class and its __init__() keyword arguments
       to construct in order to decode the named option.
     """
-    result = super(_RelationalDbSpec, cls)._GetOptionDecoderConstructions()
+    result = super()._GetOptionDecoderConstructions()
     result.update({
         'cloud': (option_decoders.EnumDecoder, {
             'valid_values': providers.VALID_CLOUDS
@@ -633,7 +672,7 @@ class _RelationalDbSpec(freeze_restore_spec.FreezeRestoreSpec):
     # Currently the only way to modify the disk spec of the
     # db is to change the benchmark spec in the benchmark source code
     # itself.
-    super(_RelationalDbSpec, cls)._ApplyFlags(config_values, flag_values)
+    super()._ApplyFlags(config_values, flag_values)
 
     # TODO(user): Rename flags 'managed_db_' -> 'db_'.
     has_db_machine_type = flag_values['managed_db_machine_type'].present
@@ -668,136 +707,151 @@ class _RelationalDbSpec(freeze_restore_spec.FreezeRestoreSpec):
           'To specify a custom client VM, both client_vm_cpus '
           'and client_vm_memory must be specified.')
 
-    if flag_values['use_managed_db'].present:
-      config_values['is_managed_db'] = flag_values.use_managed_db
-
-    if flag_values['cloud'].present or 'cloud' not in config_values:
-      config_values['cloud'] = flag_values.cloud
-    if flag_values['managed_db_engine'].present:
-      config_values['engine'] = flag_values.managed_db_engine
-    if flag_values['managed_db_engine_version'].present:
-      config_values['engine_version'] = flag_values.managed_db_engine_version
-    if flag_values['managed_db_database_name'].present:
-      config_values['database_name'] = flag_values.managed_db_database_name
-    if flag_values['managed_db_database_username'].present:
-      config_values['database_username'] = (
-          flag_values.managed_db_database_username)
-    if flag_values['managed_db_database_password'].present:
-      config_values['database_password'] = (
-          flag_values.managed_db_database_password)
-    if flag_values['managed_db_high_availability'].present:
-      config_values['high_availability'] = (
-          flag_values.managed_db_high_availability)
-    if flag_values['managed_db_backup_enabled'].present:
-      config_values['backup_enabled'] = (flag_values.managed_db_backup_enabled)
-    if flag_values['managed_db_backup_start_time'].present:
-      config_values['backup_start_time'] = (
-          flag_values.managed_db_backup_start_time)
-    if flag_values['db_flags'].present:
-      config_values['db_flags'] = flag_values.db_flags
+    _ApplyCloudFlag(config_values, flag_values)
+    option_name_from_flag = {
+        'use_managed_db': 'is_managed_db',
+        'managed_db_engine': 'engine',
+        'managed_db_engine_version': 'engine_version',
+        'managed_db_database_name': 'database_name',
+        'managed_db_database_username': 'database_username',
+        'managed_db_database_password': 'database_password',
+        'managed_db_high_availability': 'high_availability',
+        'managed_db_backup_enabled': 'backup_enabled',
+        'managed_db_backup_start_time': 'backup_start_time',
+        'db_flags': 'db_flags',
+    }
+    for flag_name, option_name in option_name_from_flag.items():
+      if flag_values[flag_name].present:
+        config_values[option_name] = flag_values[flag_name].value
     cloud = config_values['cloud']
-    has_unmanaged_dbs = ('vm_groups' in config_values and
-                         'servers' in config_values['vm_groups'])
+    # Resolve the config sections that the flags below override once. A
+    # missing section is None and only raises a MissingOption when a present
+    # flag overrides it.
+    db_vm_spec_path = ('db_spec', cloud)
+    db_disk_spec_path = ('db_disk_spec', cloud)
+    servers_path = ('vm_groups', 'servers')
+    servers_vm_spec_path = servers_path + ('vm_spec', cloud)
+    servers_disk_spec_path = servers_path + ('disk_spec', cloud)
+    clients_path = ('vm_groups', 'clients')
+    clients_vm_spec_path = clients_path + ('vm_spec', cloud)
+    clients_disk_spec_path = clients_path + ('disk_spec', cloud)
+    servers = _GetConfigSection(config_values, servers_path)
+    clients = _GetConfigSection(config_values, clients_path)
+    db_vm_spec = _GetConfigSection(config_values, db_vm_spec_path)
+    db_disk_spec = _GetConfigSection(config_values, db_disk_spec_path)
+    servers_vm_spec = _GetConfigSection(servers, ('vm_spec', cloud))
+    servers_disk_spec = _GetConfigSection(servers, ('disk_spec', cloud))
+    clients_vm_spec = _GetConfigSection(clients, ('vm_spec', cloud))
+    clients_disk_spec = _GetConfigSection(clients, ('disk_spec', cloud))
+    has_unmanaged_dbs = servers is not None
 
     if flag_values['managed_db_zone'].present:
-      config_values['db_spec'][cloud]['zone'] = flag_values.managed_db_zone[0]
+      zone = flag_values.managed_db_zone[0]
+      _SetFlagOverride(db_vm_spec, db_vm_spec_path, 'managed_db_zone', 'zone',
+                       zone)
       config_values['zones'] = flag_values.managed_db_zone
       if has_unmanaged_dbs:
-        config_values['vm_groups']['servers']['vm_spec'][cloud]['zone'] = (
-            flag_values.managed_db_zone[0])
+        _SetFlagOverride(servers_vm_spec, servers_vm_spec_path,
+                         'managed_db_zone', 'zone', zone)
     if flag_values['client_vm_zone'].present:
-      config_values['vm_groups']['clients']['vm_spec'][cloud]['zone'] = (
-          flag_values.client_vm_zone)
+      _SetFlagOverride(clients_vm_spec, clients_vm_spec_path, 'client_vm_zone',
+                       'zone', flag_values.client_vm_zone)
     if has_db_machine_type:
-      config_values['db_spec'][cloud]['machine_type'] = (
-          flag_values.managed_db_machine_type)
+      machine_type = flag_values.managed_db_machine_type
+      _SetFlagOverride(db_vm_spec, db_vm_spec_path, 'managed_db_machine_type',
+                       'machine_type', machine_type)
       if has_unmanaged_dbs:
-        config_values['vm_groups']['servers']['vm_spec'][cloud][
-            'machine_type'] = (
-                flag_values.managed_db_machine_type)
+        _SetFlagOverride(servers_vm_spec, servers_vm_spec_path,
+                         'managed_db_machine_type', 'machine_type',
+                         machine_type)
     if has_custom_machine_type:
-      config_values['db_spec'][cloud]['machine_type'] = {
-          'cpus': flag_values.managed_db_cpus,
-          'memory': flag_values.managed_db_memory
-      }
-      # tox and pylint have contradictory closing brace rules, so avoid having
-      # opening and closing brackets on different lines.
-      config_values_vm_groups = config_values['vm_groups']
+      _SetFlagOverride(db_vm_spec, db_vm_spec_path, 'managed_db_cpus',
+                       'machine_type', {
+                           'cpus': flag_values.managed_db_cpus,
+                           'memory': flag_values.managed_db_memory
+                       })
       if has_unmanaged_dbs:
-        config_values_vm_groups['servers']['vm_spec'][cloud]['machine_type'] = {
-            'cpus': flag_values.managed_db_cpus,
-            'memory': flag_values.managed_db_memory
-        }
+        _SetFlagOverride(servers_vm_spec, servers_vm_spec_path,
+                         'managed_db_cpus', 'machine_type', {
+                             'cpus': flag_values.managed_db_cpus,
+                             'memory': flag_values.managed_db_memory
+                         })
+    db_machine_type_path = db_vm_spec_path + ('machine_type',)
     if flag_values['managed_db_azure_compute_units'].present:
-      config_values['db_spec'][cloud]['machine_type']['compute_units'] = (
-          flag_values.managed_db_azure_compute_units)
+      _SetFlagOverride(
+          _GetConfigSection(db_vm_spec, ('machine_type',)),
+          db_machine_type_path, 'managed_db_azure_compute_units',
+          'compute_units', flag_values.managed_db_azure_compute_units)
     if flag_values['managed_db_tier'].present:
-      config_values['db_spec'][cloud]['machine_type']['tier'] = (
+      _SetFlagOverride(
+          _GetConfigSection(db_vm_spec, ('machine_type',)),
+          db_machine_type_path, 'managed_db_tier', 'tier',
           flag_values.managed_db_tier)
     if has_client_machine_type:
-      config_values['vm_groups']['clients']['vm_spec'][cloud][
-          'machine_type'] = (
-              flag_values.client_vm_machine_type)
+      _SetFlagOverride(clients_vm_spec, clients_vm_spec_path,
+                       'client_vm_machine_type', 'machine_type',
+                       flag_values.client_vm_machine_type)
     if has_client_custom_machine_type:
-      config_values_vm_groups = config_values['vm_groups']
-      config_values_vm_groups['clients']['vm_spec'][cloud]['machine_type'] = {
-          'cpus': flag_values.client_vm_cpus,
-          'memory': flag_values.client_vm_memory
-      }
-    if flag_values[
-        'db_num_striped_disks'].present and has_unmanaged_dbs:
-      config_values['vm_groups']['servers']['disk_spec'][cloud][
-          'num_striped_disks'] = flag_values.db_num_striped_disks
-    if flag_values['managed_db_disk_size'].present:
-      config_values['db_disk_spec'][cloud]['disk_size'] = (
-          flag_values.managed_db_disk_size)
-      if has_unmanaged_dbs:
-        config_values['vm_groups']['servers']['disk_spec'][cloud][
-            'disk_size'] = flag_values.managed_db_disk_size
-    if flag_values['managed_db_disk_type'].present:
-      config_values['db_disk_spec'][cloud]['disk_type'] = (
-          flag_values.managed_db_disk_type)
-      if has_unmanaged_dbs:
-        config_values['vm_groups']['servers']['disk_spec'][cloud][
-            'disk_type'] = flag_values.managed_db_disk_type
-    if flag_values['managed_db_disk_iops'].present:
-      # This value will be used in aws_relation_db.py druing db creation
-      config_values['db_disk_spec'][cloud]['iops'] = (
-          flag_values.managed_db_disk_iops)
-      if has_unmanaged_dbs:
-        config_values['vm_groups']['servers']['disk_spec'][cloud][
-            'iops'] = flag_values.managed_db_disk_iops
+      _SetFlagOverride(clients_vm_spec, clients_vm_spec_path, 'client_vm_cpus',
+                       'machine_type', {
+                           'cpus': flag_values.client_vm_cpus,
+                           'memory': flag_values.client_vm_memory
+                       })
+    if flag_values['db_num_striped_disks'].present and has_unmanaged_dbs:
+      _SetFlagOverride(servers_disk_spec, servers_disk_spec_path,
+                       'db_num_striped_disks', 'num_striped_disks',
+                       flag_values.db_num_striped_disks)
+    db_disk_flags = (
+        ('managed_db_disk_size', 'disk_size'),
+        ('managed_db_disk_type', 'disk_type'),
+        # This value will be used in aws_relation_db.py druing db creation
+        ('managed_db_disk_iops', 'iops'),
+    )
+    for flag_name, option_name in db_disk_flags:
+      if flag_values[flag_name].present:
+        value = flag_values[flag_name].value
+        _SetFlagOverride(db_disk_spec, db_disk_spec_path, flag_name,
+                         option_name, value)
+        if has_unmanaged_dbs:
+          _SetFlagOverride(servers_disk_spec, servers_disk_spec_path,
+                           flag_name, option_name, value)
 
     if flag_values['client_vm_os_type'].present:
-      config_values['vm_groups']['clients'][
-          'os_type'] = flag_values.client_vm_os_type
+      _SetFlagOverride(clients, clients_path, 'client_vm_os_type', 'os_type',
+                       flag_values.client_vm_os_type)
     if flag_values['server_vm_os_type'].present:
-      config_values['vm_groups']['servers'][
-          'os_type'] = flag_values.server_vm_os_type
+      _SetFlagOverride(servers, servers_path, 'server_vm_os_type', 'os_type',
+                       flag_values.server_vm_os_type)
 
     if flag_values['client_gcp_min_cpu_platform'].present:
-      config_values['vm_groups']['clients']['vm_spec'][cloud][
-          'min_cpu_platform'] = flag_values.client_gcp_min_cpu_platform
+      _SetFlagOverride(clients_vm_spec, clients_vm_spec_path,
+                       'client_gcp_min_cpu_platform', 'min_cpu_platform',
+                       flag_values.client_gcp_min_cpu_platform)
     if flag_values['server_gcp_min_cpu_platform'].present:
-      config_values['vm_groups']['servers']['vm_spec'][cloud][
-          'min_cpu_platform'] = flag_values.server_gcp_min_cpu_platform
-    if iaas_relational_db.SERVER_GCE_NUM_LOCAL_SSDS.present and has_unmanaged_dbs:
-      config_values['vm_groups']['servers']['vm_spec'][cloud][
-          'num_local_ssds'] = iaas_relational_db.SERVER_GCE_NUM_LOCAL_SSDS.value
-    if iaas_relational_db.SERVER_GCE_SSD_INTERFACE.present and has_unmanaged_dbs:
-      config_values['vm_groups']['servers']['vm_spec'][cloud][
-          'ssd_interface'] = iaas_relational_db.SERVER_GCE_SSD_INTERFACE.value
-      config_values['vm_groups']['servers']['disk_spec'][cloud][
-          'interface'] = iaas_relational_db.SERVER_GCE_SSD_INTERFACE.value
-    if flag_values['client_vm_disk_size'].present:
-      config_values['vm_groups']['clients']['disk_spec'][cloud]['disk_size'] = (
-          flag_values.client_vm_disk_size)
-    if flag_values['client_vm_disk_type'].present:
-      config_values['vm_groups']['clients']['disk_spec'][cloud]['disk_type'] = (
-          flag_values.client_vm_disk_type)
-    if flag_values['client_vm_disk_iops'].present:
-      config_values['vm_groups']['clients']['disk_spec'][cloud]['disk_iops'] = (
-          flag_values.client_vm_disk_iops)
+      _SetFlagOverride(servers_vm_spec, servers_vm_spec_path,
+                       'server_gcp_min_cpu_platform', 'min_cpu_platform',
+                       flag_values.server_gcp_min_cpu_platform)
+    num_local_ssds = iaas_relational_db.SERVER_GCE_NUM_LOCAL_SSDS
+    if num_local_ssds.present and has_unmanaged_dbs:
+      _SetFlagOverride(servers_vm_spec, servers_vm_spec_path,
+                       num_local_ssds.name, 'num_local_ssds',
+                       num_local_ssds.value)
+    ssd_interface = iaas_relational_db.SERVER_GCE_SSD_INTERFACE
+    if ssd_interface.present and has_unmanaged_dbs:
+      _SetFlagOverride(servers_vm_spec, servers_vm_spec_path,
+                       ssd_interface.name, 'ssd_interface',
+                       ssd_interface.value)
+      _SetFlagOverride(servers_disk_spec, servers_disk_spec_path,
+                       ssd_interface.name, 'interface', ssd_interface.value)
+    client_disk_flags = (
+        ('client_vm_disk_size', 'disk_size'),
+        ('client_vm_disk_type', 'disk_type'),
+        ('client_vm_disk_iops', 'disk_iops'),
+    )
+    for flag_name, option_name in client_disk_flags:
+      if flag_values[flag_name].present:
+        _SetFlagOverride(clients_disk_spec, clients_disk_spec_path, flag_name,
+                         option_name, flag_values[flag_name].value)
     logging.warning('Relational db config values: %s', config_values)
 
 
@@ -866,11 +920,11 @@ class _SparkServiceSpec(spec.BaseSpec):
     if flag_values['spark_static_cluster_id'].present:
       config_values['static_cluster_id'] = (flag_values.spark_static_cluster_id)
     if flag_values['zone'].present:
+      zone = flag_values.zone[0]
       for group in ('master_group', 'worker_group'):
         if group in config_values:
-          for cloud in config_values[group]['vm_spec']:
-            config_values[group]['vm_spec'][cloud]['zone'] = (
-                flag_values.zone[0])
+          for vm_spec in config_values[group]['vm_spec'].values():
+            vm_spec['zone'] = zone
 
 
 class _VmGroupSpec(spec.BaseSpec):
@@ -895,10 +949,7 @@ class _VmGroupSpec(spec.BaseSpec):
   def __init__(self, component_full_name, flag_values=None, **kwargs):
     super(_VmGroupSpec, self).__init__(
         component_full_name, flag_values=flag_values, **kwargs)
-    ignore_package_requirements = (
-        getattr(flag_values, 'ignore_package_requirements', True)
-        if flag_values else True)
-    providers.LoadProvider(self.cloud, ignore_package_requirements)
+    _LoadProvider(self.cloud, flag_values)
     if self.disk_spec:
       disk_config = getattr(self.disk_spec, self.cloud, None)
       if disk_config is None:
@@ -907,7 +958,7 @@ class _VmGroupSpec(spec.BaseSpec):
             'configuration for "{1}".'.format(component_full_name, self.cloud))
       disk_spec_class = disk.GetDiskSpecClass(self.cloud)
       self.disk_spec = disk_spec_class(
-          '{0}.disk_spec.{1}'.format(component_full_name, self.cloud),
+          f'{component_full_name}.disk_spec.{self.cloud}',
           flag_values=flag_values,
           **disk_config)
     vm_config = getattr(self.vm_spec, self.cloud, None)
@@ -917,7 +968,7 @@ class _VmGroupSpec(spec.BaseSpec):
           'configuration for "{1}".'.format(component_full_name, self.cloud))
     vm_spec_class = virtual_machine.GetVmSpecClass(self.cloud)
     self.vm_spec = vm_spec_class(
-        '{0}.vm_spec.{1}'.format(component_full_name, self.cloud),
+        f'{component_full_name}.vm_spec.{self.cloud}',
         flag_values=flag_values,
         **vm_config)
 
@@ -976,8 +1027,7 @@ class _VmGroupSpec(spec.BaseSpec):
         provided config values.
     """
     super(_VmGroupSpec, cls)._ApplyFlags(config_values, flag_values)
-    if flag_values['cloud'].present or 'cloud' not in config_values:
-      config_values['cloud'] = flag_values.cloud
+    _ApplyCloudFlag(config_values, flag_values)
     if flag_values['os_type'].present or 'os_type' not in config_values:
       config_values['os_type'] = flag_values.os_type
     if 'vm_count' in config_values and config_values['vm_count'] is None:
@@ -1010,11 +1060,11 @@ class _VmGroupsDecoder(option_decoders.TypeVerifier):
     vm_group_configs = super(_VmGroupsDecoder,
                              self).Decode(value, component_full_name,
                                           flag_values)
+    option_full_name = self._GetOptionFullName(component_full_name)
     result = {}
-    for vm_group_name, vm_group_config in six.iteritems(vm_group_configs):
+    for vm_group_name, vm_group_config in vm_group_configs.items():
       result[vm_group_name] = _VmGroupSpec(
-          '{0}.{1}'.format(
-              self._GetOptionFullName(component_full_name), vm_group_name),
+          f'{option_full_name}.{vm_group_name}',
           flag_values=flag_values,
           **vm_group_config)
     return result
@@ -1079,15 +1129,14 @@ class _PlacementGroupSpecsDecoder(option_decoders.TypeVerifier):
     placement_group_spec_configs = (
         super(_PlacementGroupSpecsDecoder,
               self).Decode(value, component_full_name, flag_values))
+    option_full_name = self._GetOptionFullName(component_full_name)
     result = {}
-    for placement_group_name, placement_group_spec_config in six.iteritems(
-        placement_group_spec_configs):
+    for placement_group_name, placement_group_spec_config in (
+        placement_group_spec_configs.items()):
       placement_group_spec_class = placement_group.GetPlacementGroupSpecClass(
           self.cloud)
       result[placement_group_name] = placement_group_spec_class(
-          '{0}.{1}'.format(
-              self._GetOptionFullName(component_full_name),
-              placement_group_name),
+          f'{option_full_name}.{placement_group_name}',
           flag_values=flag_values,
           **placement_group_spec_config)
     return result
@@ -1152,11 +1201,11 @@ class _ContainerSpecsDecoder(option_decoders.TypeVerifier):
     container_spec_configs = super(_ContainerSpecsDecoder,
                                    self).Decode(value, component_full_name,
                                                 flag_values)
+    option_full_name = self._GetOptionFullName(component_full_name)
     result = {}
-    for spec_name, spec_config in six.iteritems(container_spec_configs):
+    for spec_name, spec_config in container_spec_configs.items():
       result[spec_name] = container_service.ContainerSpec(
-          '{0}.{1}'.format(
-              self._GetOptionFullName(component_full_name), spec_name),
+          f'{option_full_name}.{spec_name}',
           flag_values=flag_values,
           **spec_config)
     return result
@@ -1171,7 +1220,7 @@ class _NodepoolSpec(spec.BaseSpec):
                flag_values=None,
                **kwargs):
     super(_NodepoolSpec, self).__init__(
-        '{0}.{1}'.format(component_full_name, group_name),
+        f'{component_full_name}.{group_name}',
         flag_values=flag_values,
         **kwargs)
 
@@ -1215,8 +1264,9 @@ class _NodepoolSpec(spec.BaseSpec):
     # to the spec. _NodepoolSpec does not currently support
     # running in multiple zones in a single PKB invocation.
     if flag_values['zone'].present:
-      for cloud in config_values['vm_spec']:
-        config_values['vm_spec'][cloud]['zone'] = (flag_values.zone[0])
+      zone = flag_values.zone[0]
+      for vm_spec in config_values['vm_spec'].values():
+        vm_spec['zone'] = zone
 
 
 class _NodepoolsDecoder(option_decoders.TypeVerifier):
@@ -1243,11 +1293,11 @@ class _NodepoolsDecoder(option_decoders.TypeVerifier):
     """
     nodepools_configs = super(_NodepoolsDecoder, self).Decode(
         value, component_full_name, flag_values)
+    option_full_name = self._GetOptionFullName(component_full_name)
     result = {}
-    for nodepool_name, nodepool_config in six.iteritems(nodepools_configs):
+    for nodepool_name, nodepool_config in nodepools_configs.items():
       result[nodepool_name] = _NodepoolSpec(
-          self._GetOptionFullName(component_full_name), nodepool_name,
-          flag_values, **nodepool_config)
+          option_full_name, nodepool_name, flag_values, **nodepool_config)
     return result
 
 
@@ -1318,22 +1368,18 @@ class _ContainerClusterSpec(spec.BaseSpec):
   def __init__(self, component_full_name, flag_values=None, **kwargs):
     super(_ContainerClusterSpec, self).__init__(
         component_full_name, flag_values=flag_values, **kwargs)
-    ignore_package_requirements = (
-        getattr(flag_values, 'ignore_package_requirements', True)
-        if flag_values else True)
-    providers.LoadProvider(self.cloud, ignore_package_requirements)
+    _LoadProvider(self.cloud, flag_values)
     vm_config = getattr(self.vm_spec, self.cloud, None)
     if vm_config is None:
       raise errors.Config.MissingOption(
           '{0}.cloud is "{1}", but {0}.vm_spec does not contain a '
           'configuration for "{1}".'.format(component_full_name, self.cloud))
     vm_spec_class = virtual_machine.GetVmSpecClass(self.cloud)
+    vm_spec_name = f'{component_full_name}.vm_spec.{self.cloud}'
     self.vm_spec = vm_spec_class(
-        '{0}.vm_spec.{1}'.format(component_full_name, self.cloud),
-        flag_values=flag_values,
-        **vm_config)
+        vm_spec_name, flag_values=flag_values, **vm_config)
     nodepools = {}
-    for nodepool_name, nodepool_spec in sorted(six.iteritems(self.nodepools)):
+    for nodepool_name, nodepool_spec in sorted(self.nodepools.items()):
       if nodepool_name == container_service.DEFAULT_NODEPOOL:
         raise errors.Config.InvalidValue(
             'Nodepool name {0} is reserved for use during cluster creation. '
@@ -1343,11 +1389,8 @@ class _ContainerClusterSpec(spec.BaseSpec):
         raise errors.Config.MissingOption(
             '{0}.cloud is "{1}", but {0}.vm_spec does not contain a '
             'configuration for "{1}".'.format(component_full_name, self.cloud))
-      vm_spec_class = virtual_machine.GetVmSpecClass(self.cloud)
       nodepool_spec.vm_spec = vm_spec_class(
-          '{0}.vm_spec.{1}'.format(component_full_name, self.cloud),
-          flag_values=flag_values,
-          **nodepool_config)
+          vm_spec_name, flag_values=flag_values, **nodepool_config)
       nodepools[nodepool_name] = nodepool_spec
 
     self.nodepools = nodepools
@@ -1401,8 +1444,7 @@ class _ContainerClusterSpec(spec.BaseSpec):
   @classmethod
   def _ApplyFlags(cls, config_values, flag_values):
     super(_ContainerClusterSpec, cls)._ApplyFlags(config_values, flag_values)
-    if flag_values['cloud'].present or 'cloud' not in config_values:
-      config_values['cloud'] = flag_values.cloud
+    _ApplyCloudFlag(config_values, flag_values)
     if flag_values['container_cluster_cloud'].present:
       config_values['cloud'] = flag_values.container_cluster_cloud
     if flag_values['container_cluster_type'].present:
@@ -1414,8 +1456,9 @@ class _ContainerClusterSpec(spec.BaseSpec):
     # to the spec. ContainerClusters do not currently support
     # running in multiple zones in a single PKB invocation.
     if flag_values['zone'].present:
-      for cloud in config_values['vm_spec']:
-        config_values['vm_spec'][cloud]['zone'] = (flag_values.zone[0])
+      zone = flag_values.zone[0]
+      for vm_spec in config_values['vm_spec'].values():
+        vm_spec['zone'] = zone
 
 
 class _ContainerClusterSpecDecoder(option_decoders.TypeVerifier):
@@ -1521,13 +1564,12 @@ class _NonRelationalDbDecoder(option_decoders.TypeVerifier):
     """
     non_relational_db_config = super().Decode(value, component_full_name,
                                               flag_values)
-    if 'service_type' in non_relational_db_config:
-      db_spec_class = non_relational_db.GetNonRelationalDbSpecClass(
-          non_relational_db_config['service_type'])
-    else:
+    if 'service_type' not in non_relational_db_config:
       raise errors.Config.InvalidValue(
           'Required attribute `service_type` missing from non_relational_db '
           'config.')
+    db_spec_class = non_relational_db.GetNonRelationalDbSpecClass(
+        non_relational_db_config['service_type'])
     return db_spec_class(
         self._GetOptionFullName(component_full_name), flag_values,
         **non_relational_db_config)
@@ -1557,12 +1599,11 @@ class _SpannerDecoder(option_decoders.TypeVerifier):
     """
     spanner_config = super().Decode(value, component_full_name, flag_values)
     # Allow for subclass-specific specs.
-    if 'service_type' in spanner_config:
-      spanner_spec_class = gcp_spanner.GetSpannerSpecClass(
-          spanner_config['service_type'])
-    else:
+    if 'service_type' not in spanner_config:
       raise errors.Config.InvalidValue(
           'Required attribute `service_type` missing from spanner config.')
+    spanner_spec_class = gcp_spanner.GetSpannerSpecClass(
+        spanner_config['service_type'])
     return spanner_spec_class(
         self._GetOptionFullName(component_full_name), flag_values,
         **spanner_config)
@@ -1593,11 +1634,11 @@ class _TpuGroupsDecoder(option_decoders.TypeVerifier):
     tpu_group_configs = super(_TpuGroupsDecoder,
                               self).Decode(value, component_full_name,
                                            flag_values)
+    option_full_name = self._GetOptionFullName(component_full_name)
     result = {}
-    for tpu_group_name, tpu_group_config in six.iteritems(tpu_group_configs):
+    for tpu_group_name, tpu_group_config in tpu_group_configs.items():
       result[tpu_group_name] = _TpuGroupSpec(
-          self._GetOptionFullName(component_full_name), tpu_group_name,
-          flag_values, **tpu_group_config)
+          option_full_name, tpu_group_name, flag_values, **tpu_group_config)
     return result
 
 
@@ -1608,7 +1649,7 @@ class _CloudRedisSpec(spec.BaseSpec):
     super(_CloudRedisSpec, self).__init__(
         component_full_name, flag_values=flag_values, **kwargs)
     if not self.redis_name:
-      self.redis_name = 'pkb-cloudredis-{0}'.format(flag_values.run_uri)
+      self.redis_name = f'pkb-cloudredis-{flag_values.run_uri}'
 
   @classmethod
   def _GetOptionDecoderConstructions(cls):
@@ -1646,8 +1687,7 @@ class _CloudRedisSpec(spec.BaseSpec):
         provided config values.
     """
     super(_CloudRedisSpec, cls)._ApplyFlags(config_values, flag_values)
-    if flag_values['cloud'].present or 'cloud' not in config_values:
-      config_values['cloud'] = flag_values.cloud
+    _ApplyCloudFlag(config_values, flag_values)
 
 
 class _CloudRedisDecoder(option_decoders.TypeVerifier):
@@ -1692,7 +1732,7 @@ class _VPNServiceSpec(spec.BaseSpec):
     super(_VPNServiceSpec, self).__init__(
         component_full_name, flag_values=flag_values, **kwargs)
     if not self.name:
-      self.name = 'pkb-vpn-svc-{0}'.format(flag_values.run_uri)
+      self.name = f'pkb-vpn-svc-{flag_values.run_uri}'
 
   @classmethod
   def _GetOptionDecoderConstructions(cls):
@@ -1743,18 +1783,17 @@ class _VPNServiceSpec(spec.BaseSpec):
         provided config values.
     """
     super(_VPNServiceSpec, cls)._ApplyFlags(config_values, flag_values)
-    if flag_values['vpn_service_tunnel_count'].present:
-      config_values['tunnel_count'] = flag_values.vpn_service_tunnel_count
-    if flag_values['vpn_service_gateway_count'].present:
-      config_values['gateway_count'] = flag_values.vpn_service_gateway_count
-    if flag_values['vpn_service_name'].present:
-      config_values['name'] = flag_values.vpn_service_name
-    if flag_values['vpn_service_shared_key'].present:
-      config_values['shared_key'] = flag_values.vpn_service_shared_key
-    if flag_values['vpn_service_routing_type'].present:
-      config_values['routing_type'] = flag_values.vpn_service_routing_type
-    if flag_values['vpn_service_ike_version'].present:
-      config_values['ike_version'] = flag_values.vpn_service_ike_version
+    option_name_from_flag = {
+        'vpn_service_tunnel_count': 'tunnel_count',
+        'vpn_service_gateway_count': 'gateway_count',
+        'vpn_service_name': 'name',
+        'vpn_service_shared_key': 'shared_key',
+        'vpn_service_routing_type': 'routing_type',
+        'vpn_service_ike_version': 'ike_version',
+    }
+    for flag_name, option_name in option_name_from_flag.items():
+      if flag_values[flag_name].present:
+        config_values[option_name] = flag_values[flag_name].value
 
 
 class _VPNServiceDecoder(option_decoders.TypeVerifier):
@@ -1820,12 +1859,10 @@ class _AppGroupSpec(spec.BaseSpec):
   @classmethod
   def _ApplyFlags(cls, config_values, flag_values):
     super(_AppGroupSpec, cls)._ApplyFlags(config_values, flag_values)
-    if flag_values['appservice_count'].present:
-      config_values['appservice_count'] = flag_values.appservice_count
-    if flag_values['app_runtime'].present:
-      config_values['app_runtime'] = flag_values.app_runtime
-    if flag_values['app_type'].present:
-      config_values['app_type'] = flag_values.app_type
+    # Each of these flags overrides the config option of the same name.
+    for option_name in ('appservice_count', 'app_runtime', 'app_type'):
+      if flag_values[option_name].present:
+        config_values[option_name] = flag_values[option_name].value
 
 
 class _AppGroupsDecoder(option_decoders.TypeVerifier):
@@ -1853,11 +1890,11 @@ class _AppGroupsDecoder(option_decoders.TypeVerifier):
     app_group_configs = super(_AppGroupsDecoder,
                               self).Decode(value, component_full_name,
                                            flag_values)
+    option_full_name = self._GetOptionFullName(component_full_name)
     result = {}
-    for app_group_name, app_group_config in six.iteritems(app_group_configs):
+    for app_group_name, app_group_config in app_group_configs.items():
       result[app_group_name] = _AppGroupSpec(
-          '{0}.{1}'.format(
-              self._GetOptionFullName(component_full_name), app_group_name),
+          f'{option_full_name}.{app_group_name}',
           flag_values=flag_values,
           **app_group_config)
     return result
@@ -1932,8 +1969,7 @@ class _MessagingServiceSpec(spec.BaseSpec):
           provided config values.
     """
     super()._ApplyFlags(config_values, flag_values)
-    if flag_values['cloud'].present or 'cloud' not in config_values:
-      config_values['cloud'] = flag_values.cloud
+    _ApplyCloudFlag(config_values, flag_values)
     # TODO(odiego): Handle delivery when adding more delivery mechanisms
 
 
@@ -2008,8 +2044,7 @@ class _DataDiscoveryServiceSpec(spec.BaseSpec):
           provided config values.
     """
     super()._ApplyFlags(config_values, flag_values)
-    if flag_values['cloud'].present or 'cloud' not in config_values:
-      config_values['cloud'] = flag_values.cloud
+    _ApplyCloudFlag(config_values, flag_values)
 
 
 class _DataDiscoveryServiceDecoder(option_decoders.TypeVerifier):
@@ -2070,11 +2105,13 @@ class BenchmarkConfigSpec(spec.BaseSpec):
     """
     super(BenchmarkConfigSpec, self).__init__(component_full_name, **kwargs)
     if expected_os_types is not None:
+      expected_os_type_set = frozenset(expected_os_types)
       mismatched_os_types = []
-      for group_name, group_spec in sorted(six.iteritems(self.vm_groups)):
-        if group_spec.os_type not in expected_os_types:
-          mismatched_os_types.append('{0}.vm_groups[{1}].os_type: {2}'.format(
-              component_full_name, repr(group_name), repr(group_spec.os_type)))
+      for group_name, group_spec in sorted(self.vm_groups.items()):
+        if group_spec.os_type not in expected_os_type_set:
+          mismatched_os_types.append(
+              f'{component_full_name}.vm_groups[{group_name!r}].os_type: '
+              f'{group_spec.os_type!r}')
       if mismatched_os_types:
         raise errors.Config.InvalidValue(
             'VM groups in {0} may only have the following OS types: {1}. The '
@@ -2184,7 +2221,6 @@ class BenchmarkConfigSpec(spec.BaseSpec):
     """
     # Decode benchmark-specific flags first and use them while decoding the
     # rest of the BenchmarkConfigSpec's options.
-    decoders = decoders.copy()
     self.flags = config.get('flags')
     with self.RedirectFlags(flag_values):
       super(BenchmarkConfigSpec,
@@ -19,10 +19,9 @@ import abc
 from perfkitbenchmarker import errors
 from perfkitbenchmarker import providers
 from perfkitbenchmarker.configs import spec
-import six
 
 
-class ConfigOptionDecoder(six.with_metaclass(abc.ABCMeta, object)):
+class ConfigOptionDecoder(metaclass=abc.ABCMeta):
   """Verifies and decodes a config option value.
 
   Attributes:
@@ -107,8 +106,11 @@ class EnumDecoder(ConfigOptionDecoder):
       valid_values: list of the allowed values
       **kwargs: Keyword arguments to pass to the base class.
     """
-    super(EnumDecoder, self).__init__(**kwargs)
+    super().__init__(**kwargs)
     self.valid_values = valid_values
+    # Membership is checked on every decode; valid_values keeps its order for
+    # error messages.
+    self._valid_value_set = frozenset(valid_values)
 
   def Decode(self, value, component_full_name, flag_values):
     """Verifies that the provided value is in the allowed set.
@@ -126,13 +128,15 @@ class EnumDecoder(ConfigOptionDecoder):
     Raises:
       errors.Config.InvalidValue upon invalid input value.
     """
-    if value in self.valid_values:
-      return value
-    else:
-      raise errors.Config.InvalidValue(
-          'Invalid {0} value: "{1}". Value must be one of the following: '
-          '{2}.'.format(self._GetOptionFullName(component_full_name), value,
-                        ', '.join(str(t) for t in self.valid_values)))
+    try:
+      if value in self._valid_value_set:
+        return value
+    except TypeError:
+      pass  # Unhashable values, e.g. lists, are never valid.
+    raise errors.Config.InvalidValue(
+        'Invalid {0} value: "{1}". Value must be one of the following: '
+        '{2}.'.format(self._GetOptionFullName(component_full_name), value,
+                      ', '.join(str(t) for t in self.valid_values)))
 
 
 class TypeVerifier(ConfigOptionDecoder):
@@ -149,7 +153,7 @@ class TypeVerifier(ConfigOptionDecoder):
       none_ok: boolean. If True, None is also an allowed option value.
       **kwargs: Keyword arguments to pass to the base class.
     """
-    super(TypeVerifier, self).__init__(**kwargs)
+    super().__init__(**kwargs)
     if none_ok:
       self._valid_types = (type(None),) + valid_types
     else:
@@ -185,7 +189,7 @@ class BooleanDecoder(TypeVerifier):
   """Verifies and decodes a config option value when a boolean is expected."""
 
   def __init__(self, **kwargs):
-    super(BooleanDecoder, self).__init__((bool,), **kwargs)
+    super().__init__((bool,), **kwargs)
 
 
 class IntDecoder(TypeVerifier):
@@ -197,7 +201,7 @@ class IntDecoder(TypeVerifier):
   """
 
   def __init__(self, max=None, min=None, **kwargs):
-    super(IntDecoder, self).__init__((int,), **kwargs)
+    super().__init__((int,), **kwargs)
     self.max = max
     self.min = min
 
@@ -217,8 +221,7 @@ class IntDecoder(TypeVerifier):
     Raises:
       errors.Config.InvalidValue upon invalid input value.
     """
-    value = super(IntDecoder, self).Decode(value, component_full_name,
-                                           flag_values)
+    value = super().Decode(value, component_full_name, flag_values)
     if value is not None:
       if self.max is not None and value > self.max:
         raise errors.Config.InvalidValue(
@@ -240,7 +243,7 @@ class FloatDecoder(TypeVerifier):
   """
 
   def __init__(self, max=None, min=None, **kwargs):
-    super(FloatDecoder, self).__init__((float, int), **kwargs)
+    super().__init__((float, int), **kwargs)
     self.max = max
     self.min = min
 
@@ -260,8 +263,7 @@ class FloatDecoder(TypeVerifier):
     Raises:
       errors.Config.InvalidValue upon invalid input value.
     """
-    value = super(FloatDecoder, self).Decode(value, component_full_name,
-                                             flag_values)
+    value = super().Decode(value, component_full_name, flag_values)
     if value is not None:
       if self.max is not None and value > self.max:
         raise errors.Config.InvalidValue(
@@ -278,7 +280,7 @@ class StringDecoder(TypeVerifier):
   """Verifies and decodes a config option value when a string is expected."""
 
   def __init__(self, **kwargs):
-    super(StringDecoder, self).__init__(six.string_types, **kwargs)
+    super().__init__((str,), **kwargs)
 
 
 class ListDecoder(TypeVerifier):
@@ -292,7 +294,7 @@ class ListDecoder(TypeVerifier):
           list.
       **kwargs: Keyword arguments to pass to the base class.
     """
-    super(ListDecoder, self).__init__((list,), **kwargs)
+    super().__init__((list,), **kwargs)
     self._item_decoder = item_decoder
 
   def Decode(self, value, component_full_name, flag_values):
@@ -312,8 +314,7 @@ class ListDecoder(TypeVerifier):
     Raises:
       errors.Config.InvalidValue upon invalid input value.
     """
-    input_list = super(ListDecoder, self).Decode(value, component_full_name,
-                                                 flag_values)
+    input_list = super().Decode(value, component_full_name, flag_values)
     if input_list is None:
       return None
     list_full_name = self._GetOptionFullName(component_full_name)
@@ -340,7 +341,7 @@ class _PerCloudConfigSpec(spec.BaseSpec):
       The pair specifies a decoder class and its __init__() keyword arguments
       to construct in order to decode the named option.
     """
-    result = super(_PerCloudConfigSpec, cls)._GetOptionDecoderConstructions()
+    result = super()._GetOptionDecoderConstructions()
     for cloud in providers.VALID_CLOUDS:
       result[cloud] = TypeVerifier, {
           'default': None,
@@ -353,7 +354,7 @@ class PerCloudConfigDecoder(TypeVerifier):
   """Decodes the disk_spec or vm_spec option of a VM group config object."""
 
   def __init__(self, **kwargs):
-    super(PerCloudConfigDecoder, self).__init__(valid_types=(dict,), **kwargs)
+    super().__init__(valid_types=(dict,), **kwargs)
 
   def Decode(self, value, component_full_name, flag_values):
     """Decodes the disk_spec or vm_spec option of a VM group config object.
@@ -368,7 +369,7 @@ class PerCloudConfigDecoder(TypeVerifier):
     Returns:
       _PerCloudConfigSpec decoded from the input dict.
     """
-    input_dict = super(PerCloudConfigDecoder, self).Decode(
+    input_dict = super().Decode(
         value, component_full_name, flag_values)
     return None if input_dict is None else _PerCloudConfigSpec(
         self._GetOptionFullName(component_full_name),
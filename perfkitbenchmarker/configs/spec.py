@@ -18,7 +18,6 @@ import collections
 import threading
 
 from perfkitbenchmarker import errors
-import six
 
 _SPEC_REGISTRY = {}
 
@@ -44,7 +43,7 @@ class BaseSpecMetaClass(type):
   """
 
   def __init__(cls, name, bases, dct):
-    super(BaseSpecMetaClass, cls).__init__(name, bases, dct)
+    super().__init__(name, bases, dct)
     cls._init_decoders_lock = threading.Lock()
     cls._decoders = collections.OrderedDict()
     cls._required_options = set()
@@ -58,7 +57,7 @@ class BaseSpecMetaClass(type):
       _SPEC_REGISTRY[tuple(key)] = cls
 
 
-class BaseSpec(six.with_metaclass(BaseSpecMetaClass, object)):
+class BaseSpec(metaclass=BaseSpecMetaClass):
   """Object decoded from a YAML config."""
   # The name of the spec class that will be extended with auto-registered
   # subclasses.
@@ -120,8 +119,7 @@ class BaseSpec(six.with_metaclass(BaseSpecMetaClass, object)):
     with cls._init_decoders_lock:
       if not cls._decoders:
         constructions = cls._GetOptionDecoderConstructions()
-        for option, decoder_construction in sorted(
-            six.iteritems(constructions)):
+        for option, decoder_construction in sorted(constructions.items()):
           decoder_class, init_args = decoder_construction
           decoder = decoder_class(option=option, **init_args)
           cls._decoders[option] = decoder
@@ -172,7 +170,7 @@ class BaseSpec(six.with_metaclass(BaseSpecMetaClass, object)):
     assert isinstance(decoders, collections.OrderedDict), (
         'decoders must be an OrderedDict. The order in which options are '
         'decoded must be guaranteed.')
-    for option, decoder in six.iteritems(decoders):
+    for option, decoder in decoders.items():
       if option in config:
         value = decoder.Decode(config[option], component_full_name, flag_values)
       else:
@@ -85,6 +85,11 @@ flags.DEFINE_string('dpb_wordcount_out_base', None,
                     'Base directory for word count output')
 flags.DEFINE_list('dpb_wordcount_additional_args', [], 'Additional arguments '
                   'which should be passed to job.')
+flags.DEFINE_integer('dpb_wordcount_shuffle_partitions', None,
+                     'Number of shuffle partitions for Spark word count jobs. '
+                     'Sets spark.sql.shuffle.partitions and '
+                     'spark.default.parallelism. Defaults to the Spark '
+                     'defaults.', lower_bound=1)
 
 FLAGS = flags.FLAGS
 
@@ -160,6 +165,16 @@ def Run(benchmark_spec):
     job_arguments = [input_location]
   job_arguments.extend(FLAGS.dpb_wordcount_additional_args)
 
+  # Only Spark jobs accept job properties.
+  submit_job_kwargs = {}
+  shuffle_partitions = FLAGS.dpb_wordcount_shuffle_partitions
+  if (shuffle_partitions and
+      job_type == dpb_service.BaseDpbService.SPARK_JOB_TYPE):
+    submit_job_kwargs['properties'] = {
+        'spark.sql.shuffle.partitions': str(shuffle_partitions),
+        'spark.default.parallelism': str(shuffle_partitions),
+    }
+
   # TODO (saksena): Finalize more stats to gather
   results = []
 
@@ -169,12 +184,15 @@ def Run(benchmark_spec):
       classname=classname,
       job_arguments=job_arguments,
       job_stdout_file=stdout_file,
-      job_type=job_type)
+      job_type=job_type,
+      **submit_job_kwargs)
   end_time = datetime.datetime.now()
 
   # Update metadata after job run to get job id
   metadata = copy.copy(dpb_service_instance.GetMetadata())
   metadata.update({'input_location': input_location})
+  if 'properties' in submit_job_kwargs:
+    metadata['dpb_wordcount_shuffle_partitions'] = shuffle_partitions
 
   run_time = (end_time - start_time).total_seconds()
   results.append(sample.Sample('run_time', run_time, 'seconds', metadata))
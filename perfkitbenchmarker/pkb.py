@@ -1147,10 +1147,12 @@ def RunBenchmark(spec, collector):
         elif (isinstance(e, errors.Benchmarks.UnsupportedConfigError) or
               'UnsupportedConfigError' in str(e)):
           spec.failed_substatus = benchmark_status.FailedSubstatus.UNSUPPORTED
-        elif isinstance(e, errors.Resource.RestoreError):
+        elif (isinstance(e, errors.Resource.RestoreError) or
+              'RestoreError' in str(e)):
           spec.failed_substatus = (
               benchmark_status.FailedSubstatus.RESTORE_FAILED)
-        elif isinstance(e, errors.Resource.FreezeError):
+        elif (isinstance(e, errors.Resource.FreezeError) or
+              'FreezeError' in str(e)):
           spec.failed_substatus = (
               benchmark_status.FailedSubstatus.FREEZE_FAILED)
         else:
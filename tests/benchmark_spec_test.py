@@ -14,6 +14,7 @@
 """Tests for perfkitbenchmarker.benchmark_spec."""
 
 import inspect
+import pickle
 import unittest
 
 from absl import flags
@@ -22,6 +23,8 @@ import mock
 from perfkitbenchmarker import benchmark_spec
 from perfkitbenchmarker import configs
 from perfkitbenchmarker import context
+from perfkitbenchmarker import errors
+from perfkitbenchmarker import os_types
 from perfkitbenchmarker import pkb  # pylint: disable=unused-import # noqa
 from perfkitbenchmarker import providers
 from perfkitbenchmarker import static_virtual_machine as static_vm
@@ -178,6 +181,35 @@ class ConstructSpannerTestCase(_BenchmarkSpecTestCase):
 
     self.assertEqual(self.test_bm_spec.spanner.name, 'restore_spanner')
 
+  def testRestoreSpecWithoutInstanceConstructsNewInstance(self):
+    self.test_bm_spec.restore_spec = benchmark_spec.BenchmarkSpecState()
+
+    self.test_bm_spec.ConstructSpanner()
+
+    self.assertIsInstance(self.test_bm_spec.spanner,
+                          gcp_spanner.GcpSpannerInstance)
+
+  @flagsaver.flagsaver
+  def testRestoreInstanceFromFrozenState(self):
+    frozen_bm_spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(
+        yaml_string=inspect.cleandoc("""
+        cloud_spanner_ycsb:
+          spanner:
+            name: frozen_spanner
+            service_type: default
+        """), benchmark_name='cloud_spanner_ycsb')
+    frozen_bm_spec.ConstructSpanner()
+    frozen_bm_spec.freeze_path = self.create_tempfile().full_path
+
+    frozen_bm_spec.Freeze()
+    with open(frozen_bm_spec.freeze_path, 'rb') as spec_file:
+      self.test_bm_spec.restore_spec = pickle.load(spec_file)
+    self.test_bm_spec.ConstructSpanner()
+
+    self.assertIsInstance(self.test_bm_spec.restore_spec,
+                          benchmark_spec.BenchmarkSpecState)
+    self.assertEqual(self.test_bm_spec.spanner.name, 'frozen_spanner')
+
 
 class ConstructVmsTestCase(_BenchmarkSpecTestCase):
 
@@ -248,6 +280,23 @@ class ConstructVmsTestCase(_BenchmarkSpecTestCase):
     self.assertEqual(spec.vm_groups['group1'][0].zone, 'us-east-1b')
     self.assertEqual(spec.vm_groups['group2'][0].zone, 'us-west-2b')
 
+  @flagsaver.flagsaver
+  def testGroupsConstructedInSortedOrder(self):
+    FLAGS.zone = ['zone1', 'zone2']
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml("""
+cluster_boot:
+  vm_groups:
+    servers:
+      vm_spec: *default_single_core
+    clients:
+      vm_spec: *default_single_core
+""")
+    spec.ConstructVirtualMachines()
+    self.assertEqual(spec.vms, spec.vm_groups['clients'] +
+                     spec.vm_groups['servers'])
+    self.assertEqual(spec.vm_groups['clients'][0].zone, 'zone1')
+    self.assertEqual(spec.vm_groups['servers'][0].zone, 'zone2')
+
 
 class BenchmarkSupportTestCase(_BenchmarkSpecTestCase):
 
@@ -283,6 +332,301 @@ class BenchmarkSupportTestCase(_BenchmarkSpecTestCase):
     self.assertTrue(self.createBenchmarkSpec(config, ALWAYS_SUPPORTED))
     self.assertTrue(self.createBenchmarkSpec(config, NEVER_SUPPORTED))
 
+  def testSupportCheckedOncePerCloud(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    provider_info_class = mock.Mock()
+    provider_info_class.IsBenchmarkSupported.return_value = True
+    self.enter_context(
+        mock.patch.object(
+            benchmark_spec.provider_info,
+            'GetProviderInfoClass',
+            return_value=provider_info_class))
+
+    spec._CheckBenchmarkSupport(providers.GCP)
+    spec._CheckBenchmarkSupport(providers.GCP)
+
+    provider_info_class.IsBenchmarkSupported.assert_called_once_with(NAME)
+
+
+class ProvisionTestCase(_BenchmarkSpecTestCase):
+
+  def testServicesCreated(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.dpb_service = mock.Mock()
+    spec.spanner = mock.Mock()
+    spec.tpus = [mock.Mock(), mock.Mock()]
+
+    spec.Provision()
+
+    spec.dpb_service.Create.assert_called_once_with()
+    spec.spanner.Create.assert_called_once_with(restore=False)
+    for tpu in spec.tpus:
+      tpu.Create.assert_called_once_with()
+
+  def testContainerImagesBuiltOnce(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.container_registry = mock.Mock()
+    spec.container_registry.GetOrBuild.side_effect = (
+        lambda image: 'registry/' + image)
+    spec.container_specs = {
+        'a': mock.Mock(image='a', static_image=False),
+        'b': mock.Mock(image='b', static_image=False),
+        'a2': mock.Mock(image='a', static_image=False),
+        'static': mock.Mock(image='static', static_image=True),
+    }
+
+    spec.Provision()
+
+    self.assertCountEqual(
+        [mock.call('a'), mock.call('b')],
+        spec.container_registry.GetOrBuild.call_args_list)
+    self.assertEqual(
+        {name: container_spec.image
+         for name, container_spec in spec.container_specs.items()},
+        {'a': 'registry/a', 'b': 'registry/b', 'a2': 'registry/a',
+         'static': 'static'})
+
+  def testSshConfigSkipsWindowsVms(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    linux_vm = mock.Mock(OS_TYPE=os_types.DEFAULT)
+    windows_vm = mock.Mock(OS_TYPE=os_types.WINDOWS2019_CORE)
+    spec.vm_groups = {'clients': [windows_vm], 'servers': [linux_vm]}
+    spec.vms = [windows_vm, linux_vm]
+    self.enter_context(mock.patch.object(spec, 'CreateAndBootVm'))
+    self.enter_context(mock.patch.object(spec, 'PrepareVmAfterBoot'))
+    mock_ssh_config = self.enter_context(
+        mock.patch.object(benchmark_spec.vm_util, 'GenerateSSHConfig'))
+
+    spec.Provision()
+
+    mock_ssh_config.assert_called_once_with(
+        [linux_vm], {'clients': [], 'servers': [linux_vm]})
+
+  def testServiceCreateFailureRaises(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.dpb_service = mock.Mock()
+    spec.spanner = mock.Mock()
+    spec.spanner.Create.side_effect = Exception('spanner failed')
+
+    with self.assertRaisesRegex(Exception, 'spanner failed'):
+      spec.Provision()
+    spec.dpb_service.Create.assert_called_once_with()
+
+  def testServiceCreateFailureStopsCreation(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.spanner = mock.Mock()
+    spec.spanner.Create.side_effect = errors.Resource.RestoreError('restore')
+    spec.tpus = [mock.Mock()]
+
+    with self.assertRaises(errors.Resource.RestoreError):
+      spec.Provision()
+    spec.tpus[0].Create.assert_not_called()
+
+  @flagsaver.flagsaver(create_services_in_parallel=True)
+  def testServicesCreatedInParallel(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.relational_db = mock.Mock(is_managed_db=False)
+    spec.spanner = mock.Mock()
+    spec.tpus = [mock.Mock()]
+    mock_run_parallel = self.enter_context(
+        mock.patch.object(benchmark_spec.vm_util, 'RunParallelThreads'))
+
+    spec.Provision()
+
+    # The unmanaged database is set up on the VMs, so it is created directly.
+    spec.relational_db.Create.assert_called_once_with(restore=False)
+    mock_run_parallel.assert_called_once_with(
+        [(spec.spanner.Create, (), {'restore': False}),
+         (spec.tpus[0].Create, (), {})], 2)
+
+  @flagsaver.flagsaver(create_services_in_parallel=True)
+  def testSingleServiceCreatedDirectly(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.spanner = mock.Mock()
+    spec.spanner.Create.side_effect = errors.Resource.RestoreError('restore')
+    mock_run_parallel = self.enter_context(
+        mock.patch.object(benchmark_spec.vm_util, 'RunParallelThreads'))
+
+    with self.assertRaises(errors.Resource.RestoreError):
+      spec.Provision()
+    mock_run_parallel.assert_not_called()
+
+
+class CreateAndBootVmTestCase(_BenchmarkSpecTestCase):
+
+  def testFirewallOpenedBeforeBootWait(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    vm = mock.Mock()
+
+    spec.CreateAndBootVm(vm)
+
+    self.assertEqual(
+        [mock.call.Create(), mock.call.AllowRemoteAccessPorts(),
+         mock.call.WaitForBootCompletion()], vm.method_calls)
+
+  @flagsaver.flagsaver(overlap_boot_and_firewall=True)
+  def testOverlapBootAndFirewall(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    vm = mock.Mock()
+
+    spec.CreateAndBootVm(vm)
+
+    vm.Create.assert_called_once_with()
+    vm.AllowRemoteAccessPorts.assert_called_once_with()
+    vm.WaitForBootCompletion.assert_called_once_with()
+
+
+class DeleteTestCase(_BenchmarkSpecTestCase):
+
+  def testServicesDeleted(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.dpb_service = mock.Mock()
+    spec.spanner = mock.Mock()
+    spec.tpus = [mock.Mock(), mock.Mock()]
+
+    spec.Delete()
+
+    spec.dpb_service.Delete.assert_called_once_with()
+    spec.spanner.Delete.assert_called_once_with(freeze=False)
+    for tpu in spec.tpus:
+      tpu.Delete.assert_called_once_with()
+    self.assertTrue(spec.deleted)
+
+  def testServiceDeleteFailureContinuesTeardown(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.dpb_service = mock.Mock()
+    spec.dpb_service.Delete.side_effect = Exception('dpb failed')
+    spec.spanner = mock.Mock()
+    network = mock.Mock()
+    spec.networks = {'net': network}
+
+    with self.assertRaisesRegex(Exception, 'dpb failed'):
+      spec.Delete()
+
+    spec.spanner.Delete.assert_called_once()
+    network.Delete.assert_called_once_with()
+    self.assertFalse(spec.deleted)
+
+  def testServiceFreezeErrorRaised(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.spanner = mock.Mock()
+    spec.spanner.Delete.side_effect = errors.Resource.FreezeError('frozen')
+    spec.vms = [mock.Mock()]
+    delete_vm = self.enter_context(mock.patch.object(spec, 'DeleteVm'))
+
+    with self.assertRaises(errors.Resource.FreezeError):
+      spec.Delete()
+
+    delete_vm.assert_called_once_with(spec.vms[0])
+
+  def testServiceErrorKeptWhenContainerClusterDeleteFails(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.spanner = mock.Mock()
+    spec.spanner.Delete.side_effect = errors.Resource.FreezeError('frozen')
+    spec.container_cluster = mock.Mock()
+    spec.container_cluster.Delete.side_effect = Exception('cluster failed')
+    network = mock.Mock()
+    spec.networks = {'net': network}
+
+    with self.assertRaises(errors.Resource.FreezeError):
+      spec.Delete()
+
+    network.Delete.assert_called_once_with()
+
+  def testVmDeleteFailureDeletesCapacityReservations(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    reservation = mock.Mock()
+    spec.capacity_reservations = [reservation]
+    spec.vms = [mock.Mock()]
+    self.enter_context(mock.patch.object(
+        spec, 'DeleteVm', side_effect=Exception('vm failed')))
+
+    spec.Delete()
+
+    reservation.Delete.assert_called_once_with()
+    spec.DeleteVm.assert_called_once_with(spec.vms[0])
+    self.assertTrue(spec.deleted)
+
+  def testContainerClusterDeletedBeforeNetworks(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    manager = mock.Mock()
+    spec.firewalls = {'fw': manager.firewall}
+    spec.container_cluster = manager.cluster
+    spec.networks = {'net': manager.network}
+
+    spec.Delete()
+
+    calls = manager.mock_calls
+    self.assertIn(mock.call.firewall.DisallowAllPorts(), calls)
+    self.assertLess(calls.index(mock.call.cluster.Delete()),
+                    calls.index(mock.call.network.Delete()))
+    self.assertTrue(spec.deleted)
+
+  def testNetworkDeleteFailureDeletesOtherNetworks(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    firewall = mock.Mock()
+    failing_network = mock.Mock()
+    failing_network.Delete.side_effect = Exception('network failed')
+    network = mock.Mock()
+    spec.firewalls = {'fw': firewall}
+    spec.networks = {'a': failing_network, 'b': network}
+
+    spec.Delete()
+
+    firewall.DisallowAllPorts.assert_called_once_with()
+    network.Delete.assert_called_once_with()
+    self.assertTrue(spec.deleted)
+
+
+class ResourceTagsTestCase(_BenchmarkSpecTestCase):
+
+  @flagsaver.flagsaver
+  def testMetadataTagsAreSanitized(self):
+    FLAGS.metadata = ['Team:Perf-Kit', 'r\u00e9gion:' + 'x' * 70]
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+
+    tags = spec.GetResourceTags()
+
+    self.assertEqual(tags['team'], 'perf_kit')
+    self.assertEqual(tags['r\u00e9gion'], 'x' * 63)
+
+
+class PickleTestCase(_BenchmarkSpecTestCase):
+
+  def testLocksRecreatedOnUnpickle(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec.networks_lock.acquire()
+
+    unpickled_spec = pickle.loads(pickle.dumps(spec))
+
+    self.assertEqual(unpickled_spec.uid, spec.uid)
+    self.assertIsNot(unpickled_spec.networks_lock, spec.networks_lock)
+    self.assertFalse(unpickled_spec.networks_lock.locked())
+    self.assertFalse(unpickled_spec.vpns_lock.locked())
+
+  def testTransientAttributesNotPickled(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    spec._supported_clouds.add(providers.GCP)
+
+    state = spec.__getstate__()
+    unpickled_spec = pickle.loads(pickle.dumps(spec))
+
+    self.assertNotIn('_supported_clouds', state)
+    self.assertNotIn('networks_lock', state)
+    self.assertEqual(unpickled_spec._supported_clouds, set())
+
+  def testOptionalAttributesDefaultedOnUnpickle(self):
+    spec = pkb_common_test_case.CreateBenchmarkSpecFromYaml(SIMPLE_CONFIG)
+    del spec.messaging_service
+    del spec.placement_groups
+
+    unpickled_spec = pickle.loads(pickle.dumps(spec))
+
+    self.assertIsNone(unpickled_spec.messaging_service)
+    self.assertEqual(unpickled_spec.placement_groups, {})
+    unpickled_spec.Delete()
+    self.assertTrue(unpickled_spec.deleted)
+
 
 class RedirectGlobalFlagsTestCase(pkb_common_test_case.PkbCommonTestCase):
 
@@ -427,6 +427,46 @@ class CloudRedisSpecTestCase(pkb_common_test_case.PkbCommonTestCase):
     self.assertEqual(result.redis_version, 'redis_3_2')
 
 
+class TpuGroupSpecTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def testPresentFlagsOverrideConfigValues(self):
+    FLAGS.run_uri = 'test'
+    FLAGS['tpu_zone'].parse('us-central1-b')
+    FLAGS['tpu_preemptible'].parse(True)
+    result = benchmark_config_spec._TpuGroupSpec(
+        _COMPONENT, 'tpu', flag_values=FLAGS, cloud=providers.GCP,
+        tpu_zone='us-central1-a', tpu_tf_version='2.4')
+    self.assertEqual(result.tpu_zone, 'us-central1-b')
+    self.assertTrue(result.tpu_preemptible)
+    self.assertEqual(result.tpu_tf_version, '2.4')
+    self.assertEqual(result.tpu_name, 'pkb-tpu-tpu-test')
+
+
+class EdwServiceSpecTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def testPresentFlagsOverrideConfigValues(self):
+    FLAGS['edw_service_cluster_db'].parse('flag_db')
+    FLAGS['edw_service_cluster_concurrency'].parse(10)
+    result = benchmark_config_spec._EdwServiceSpec(
+        _COMPONENT, flag_values=FLAGS, db='config_db', user='config_user')
+    self.assertEqual(result.db, 'flag_db')
+    self.assertEqual(result.concurrency, 10)
+    self.assertEqual(result.user, 'config_user')
+
+
+class VpnServiceSpecTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def testPresentFlagsOverrideConfigValues(self):
+    FLAGS['vpn_service_tunnel_count'].parse(2)
+    FLAGS['vpn_service_shared_key'].parse('flag_key')
+    result = benchmark_config_spec._VPNServiceSpec(
+        _COMPONENT, flag_values=FLAGS, name='config_name',
+        shared_key='config_key')
+    self.assertEqual(result.tunnel_count, 2)
+    self.assertEqual(result.shared_key, 'flag_key')
+    self.assertEqual(result.name, 'config_name')
+
+
 class BenchmarkConfigSpecTestCase(pkb_common_test_case.PkbCommonTestCase):
 
   def setUp(self):
@@ -97,6 +97,26 @@ class TypeVerifierTestCase(unittest.TestCase):
         'Value must be one of the following types: NoneType, int, float.'))
 
 
+class EnumDecoderTestCase(unittest.TestCase):
+
+  def testValidValue(self):
+    decoder = option_decoders.EnumDecoder(['red', 'green'], option=_OPTION)
+    self.assertEqual(decoder.Decode('green', _COMPONENT, _FLAGS), 'green')
+
+  def testInvalidValue(self):
+    decoder = option_decoders.EnumDecoder(['red', 'green'], option=_OPTION)
+    with self.assertRaises(errors.Config.InvalidValue) as cm:
+      decoder.Decode('blue', _COMPONENT, _FLAGS)
+    self.assertEqual(str(cm.exception), (
+        'Invalid test_component.test_option value: "blue". Value must be one '
+        'of the following: red, green.'))
+
+  def testUnhashableValue(self):
+    decoder = option_decoders.EnumDecoder(['red', 'green'], option=_OPTION)
+    with self.assertRaises(errors.Config.InvalidValue):
+      decoder.Decode(['red'], _COMPONENT, _FLAGS)
+
+
 class BooleanDecoderTestCase(unittest.TestCase):
 
   def testDefault(self):
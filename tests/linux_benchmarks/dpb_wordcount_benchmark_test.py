@@ -0,0 +1,68 @@
+# Copyright 2021 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for dpb_wordcount_benchmark."""
+
+import unittest
+from absl.testing import flagsaver
+import mock
+
+from perfkitbenchmarker import dpb_service
+from perfkitbenchmarker import pkb  # pylint:disable=unused-import
+from perfkitbenchmarker.linux_benchmarks import dpb_wordcount_benchmark
+from tests import pkb_common_test_case
+
+
+def MockBenchmarkSpec(service_type):
+  dpb_service_instance = mock.Mock(SERVICE_TYPE=service_type, job_stats={})
+  dpb_service_instance.GetMetadata.return_value = {}
+  dpb_service_instance.GetAvgCpuUtilization.return_value = 50.0
+  dpb_service_instance.CalculateCost.return_value = 1.0
+  return mock.Mock(
+      dpb_service=dpb_service_instance, dpb_wordcount_jarfile='wordcount.jar')
+
+
+class DpbWordcountBenchmarkTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  @flagsaver.flagsaver(dpb_wordcount_shuffle_partitions=64)
+  def testShufflePartitionsSetForSparkJob(self):
+    spec = MockBenchmarkSpec(dpb_service.DATAPROC)
+    samples = dpb_wordcount_benchmark.Run(spec)
+    _, kwargs = spec.dpb_service.SubmitJob.call_args
+    self.assertEqual(kwargs['job_type'],
+                     dpb_service.BaseDpbService.SPARK_JOB_TYPE)
+    self.assertEqual(kwargs['properties'], {
+        'spark.sql.shuffle.partitions': '64',
+        'spark.default.parallelism': '64',
+    })
+    self.assertEqual(samples[0].metadata['dpb_wordcount_shuffle_partitions'],
+                     64)
+
+  def testShufflePartitionsUnset(self):
+    spec = MockBenchmarkSpec(dpb_service.DATAPROC)
+    samples = dpb_wordcount_benchmark.Run(spec)
+    _, kwargs = spec.dpb_service.SubmitJob.call_args
+    self.assertNotIn('properties', kwargs)
+    self.assertNotIn('dpb_wordcount_shuffle_partitions', samples[0].metadata)
+
+  @flagsaver.flagsaver(dpb_wordcount_shuffle_partitions=64)
+  def testShufflePartitionsIgnoredForNonSparkJob(self):
+    spec = MockBenchmarkSpec(dpb_service.DATAFLOW)
+    samples = dpb_wordcount_benchmark.Run(spec)
+    _, kwargs = spec.dpb_service.SubmitJob.call_args
+    self.assertNotIn('properties', kwargs)
+    self.assertNotIn('dpb_wordcount_shuffle_partitions', samples[0].metadata)
+
+
+if __name__ == '__main__':
+  unittest.main()
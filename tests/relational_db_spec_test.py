@@ -181,6 +181,13 @@ class RelationalDbMinimalSpecTestCase(pkb_common_test_case.PkbCommonTestCase):
       benchmark_config_spec._RelationalDbSpec(
           _COMPONENT, flag_values=FLAGS, **self.spec)
 
+  def testVmSpecForCloudRequiredWithZoneFlag(self):
+    FLAGS['managed_db_zone'].parse('us-east1-b')
+    self.spec['db_spec'] = {'AWS': {'machine_type': 'db.m4.large'}}
+    with self.assertRaisesRegexp(errors.Config.MissingOption, 'db_spec'):
+      benchmark_config_spec._RelationalDbSpec(
+          _COMPONENT, flag_values=FLAGS, **self.spec)
+
 
 class RelationalDbFlagsTestCase(pkb_common_test_case.PkbCommonTestCase):
 
@@ -313,6 +320,28 @@ class RelationalDbFlagsTestCase(pkb_common_test_case.PkbCommonTestCase):
         _COMPONENT, flag_values=FLAGS, **self.full_spec)
     self.assertEqual(result.vm_groups['clients'].disk_spec.disk_size, 2000)
 
+  def testClientVmDiskSizeFlagWithoutDiskSpec(self):
+    FLAGS['client_vm_disk_size'].parse(77)
+    del self.full_spec['vm_groups']['clients']['disk_spec']
+    with self.assertRaisesRegexp(errors.Config.MissingOption,
+                                 'client_vm_disk_size.*clients.disk_spec'):
+      benchmark_config_spec._RelationalDbSpec(
+          _COMPONENT, flag_values=FLAGS, **self.full_spec)
+
+  def testMissingClientDiskSpecWithoutFlag(self):
+    del self.full_spec['vm_groups']['clients']['disk_spec']
+    result = benchmark_config_spec._RelationalDbSpec(
+        _COMPONENT, flag_values=FLAGS, **self.full_spec)
+    self.assertIsNone(result.vm_groups['clients'].disk_spec)
+
+  def testClientVmZoneFlagWithoutVmSpec(self):
+    FLAGS['client_vm_zone'].parse('us-east1-b')
+    del self.full_spec['vm_groups']['clients']['vm_spec']
+    with self.assertRaisesRegexp(errors.Config.MissingOption,
+                                 'client_vm_zone.*clients.vm_spec'):
+      benchmark_config_spec._RelationalDbSpec(
+          _COMPONENT, flag_values=FLAGS, **self.full_spec)
+
 
 if __name__ == '__main__':
   unittest.main()